@@ -0,0 +1,179 @@
+"""Images of the game, decoded on a thread pool and kept scaled to the sizes they are drawn at.
+
+Renderers ask for an image at the size they draw it at, in device pixels. A size that is not ready yet is made on the
+pool while the renderer goes on without it, and the renderer is told once it is ready, so no image is ever decoded or
+scaled while painting. Decoded images and their scaled variants share one least recently used cache, which is trimmed
+to a memory budget.
+
+Only renderers should import this module, as it is what pulls in Qt (see Card.load_card_image).
+
+Usage:
+    image = assets.request('Pew', 96, 96, notify=widget.update)  # None until it is ready
+    image = assets.scaled('field bg', 1600, 900, Qt.KeepAspectRatioByExpanding)  # Waits for it instead
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'img')
+CACHE_BUDGET = 64 * 1024 * 1024  # Bytes of decoded and scaled images kept around
+DECODE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+class AssetManager:
+    """Decodes the images of a directory on demand and keeps them, and scaled variants of them, in a budgeted cache.
+
+    An image is identified by its asset name and size, such as ('Pew', 96, 96, Qt.IgnoreAspectRatio), with None for
+    the width and height of the image as it was decoded. Assets that fail to load are kept as null QImages.
+
+    Attributes:
+        directory (str): Where the images are, as '<asset name in lower case>.png'.
+        budget (int): Bytes of images kept in the cache. The least recently used ones go first.
+        workers (int): Threads decoding and scaling the images.
+    """
+
+    def __init__(self, directory: str = ASSET_DIR, budget: int = CACHE_BUDGET, workers: int = DECODE_WORKERS):
+        self.directory = directory
+        self.budget = budget
+        self.workers = workers
+        self.cache = OrderedDict()  # (asset, width, height, aspect mode) -> QImage, least recently used first
+        self.cache_bytes = 0
+        self._pending = {}  # Key -> (future making it, callbacks waiting for it)
+        self._lock = threading.Lock()
+        self._pool = None  # Started on first use
+
+    def path(self, asset: str):
+        return os.path.join(self.directory, f'{asset.lower()}.png')
+
+    def request(self, asset: str, width=None, height=None, mode=Qt.IgnoreAspectRatio, notify=None):
+        """Return the image at the given size if it is ready, or start making it on the pool and return None.
+
+        notify is called once the image is ready, from a thread of the pool, if it had to be made.
+        """
+        key = (asset, width, height, mode)
+        with self._lock:
+            image = self.cache.get(key)
+            if image is not None:
+                self.cache.move_to_end(key)
+                return image
+            self._submit([key], notify)
+        return None
+
+    def scaled(self, asset: str, width=None, height=None, mode=Qt.IgnoreAspectRatio):
+        """Return the image at the given size, waiting for it to be made if it is not ready."""
+        key = (asset, width, height, mode)
+        with self._lock:
+            image = self.cache.get(key)
+            if image is not None:
+                self.cache.move_to_end(key)
+                return image
+            future = self._submit([key], None)
+        return future.result()[key]
+
+    def image(self, asset: str):
+        """Return the image as it was decoded, waiting for it to be decoded if it is not ready."""
+        return self.scaled(asset)
+
+    def prepare(self, asset: str, sizes, mode=Qt.IgnoreAspectRatio, notify=None):
+        """Start making the image at every size of sizes (pairs of width and height) that is not ready yet.
+
+        They are made in the given order by a single job, which decodes the image only once.
+        """
+        with self._lock:
+            keys = [(asset, width, height, mode) for width, height in sizes]
+            keys = [key for key in keys if key not in self.cache]
+            if keys:
+                self._submit(keys, notify)
+
+    def nearest(self, asset: str, width: int, height: int, mode=Qt.IgnoreAspectRatio):
+        """Return the ready variant of the asset closest to the given size, or None if there is none.
+
+        Renderers draw it unscaled in place of a size that is still being made.
+        """
+        with self._lock:
+            best, best_distance = None, None
+            for key, image in self.cache.items():
+                if key[0] == asset and key[1] is not None and key[3] == mode:
+                    distance = abs(key[1] - width) + abs(key[2] - height)
+                    if best is None or distance < best_distance:
+                        best, best_distance = image, distance
+            return best
+
+    def wait(self):
+        """Wait until every image requested so far is ready."""
+        with self._lock:
+            futures = [future for future, callbacks in self._pending.values()]
+        wait(futures)
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self.cache_bytes = 0
+
+    def _submit(self, keys: list, notify):
+        """Make the keys that are not being made yet in one job and return its future. Called with the lock held."""
+        new = [key for key in keys if key not in self._pending]
+        if new:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='assets')
+            future = self._pool.submit(self._make, new)
+            for key in new:
+                self._pending[key] = (future, [])
+        future = None
+        for key in keys:
+            future, callbacks = self._pending[key]
+            if notify is not None and notify not in callbacks:
+                callbacks.append(notify)
+        return future
+
+    def _make(self, keys: list):
+        """Job of the pool: make the images of the keys, cache them and tell whoever waits for them."""
+        made = {}
+        for key in keys:
+            asset, width, height, mode = key
+            if width is None:
+                image = QImage(self.path(asset))
+            else:
+                original_key = (asset, None, None, Qt.IgnoreAspectRatio)
+                original = made.get(original_key)
+                if original is None:
+                    with self._lock:
+                        original = self.cache.get(original_key)
+                    if original is None:
+                        # Decoded here rather than in a job of its own, which could be queued behind this one
+                        original = QImage(self.path(asset))
+                        self._notify(self._store(original_key, original))
+                    made[original_key] = original
+                image = original if original.isNull() else original.scaled(width, height, mode, Qt.SmoothTransformation)
+            made[key] = image
+            self._notify(self._store(key, image))
+        return made
+
+    def _store(self, key: tuple, image):
+        """Cache the image, trim the cache to the budget and return the callbacks that waited for it."""
+        with self._lock:
+            previous = self.cache.pop(key, None)
+            if previous is not None:
+                self.cache_bytes -= previous.sizeInBytes()
+            self.cache[key] = image
+            self.cache_bytes += image.sizeInBytes()
+            while self.cache_bytes > self.budget and len(self.cache) > 1:
+                evicted_key, evicted = self.cache.popitem(last=False)
+                self.cache_bytes -= evicted.sizeInBytes()
+            future, callbacks = self._pending.pop(key, (None, []))
+            return callbacks
+
+    @staticmethod
+    def _notify(callbacks: list):
+        for notify in callbacks:
+            try:
+                notify()
+            except RuntimeError:
+                pass  # Such as the signal of a window that was closed in the meantime
+
+
+assets = AssetManager()
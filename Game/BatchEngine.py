@@ -0,0 +1,239 @@
+"""Vectorized lockstep battle engine for resolving many boards at once.
+
+The scalar engine in Match walks each board one slot at a time and dispatches to a Card object per slot. This engine
+packs the combat state of many matches into NumPy struct-of-arrays (one row per match, one column per side and board
+slot) and resolves the EFFECTS and ATTACKS phases for all of them together. Slots are still visited in the same order as
+Match.activate_effects and Match.perform_attacks, so the results are identical to the scalar engine; only the per-match
+work is vectorized.
+
+Only the simple stat-based effects are vectorized. A match with any other card on either board (Royal Summoner, Time
+Lord, ...) is resolved through the scalar Match methods instead.
+
+Usage:
+    battle = BatchBattle(matches)  # Matches in their EFFECTS phase, with the cards already played
+    battle.activate_effects()
+    battle.perform_attacks()
+    battle.write_back()  # Copy the results back onto the Card and User objects
+"""
+import numpy as np
+
+from Card import Bank, BigShot, Boom, Cheerleader, Copycat, Pew, SimpleCard
+
+# Effect kinds handled by the vectorized path
+NO_EFFECT = 0
+DAMAGE = 1  # Pew and Pew Pew
+BOOM = 2
+BIG_SHOT = 3
+CHEERLEADER = 4
+COPYCAT = 5
+BANK = 6
+
+effect_kinds = {
+    SimpleCard: NO_EFFECT,
+    Pew: DAMAGE,
+    Boom: BOOM,
+    BigShot: BIG_SHOT,
+    Cheerleader: CHEERLEADER,
+    Copycat: COPYCAT,
+    Bank: BANK,
+}
+
+# SimpleCard and Copycat ignore (and keep) the frozen status, every other effect is skipped and thaws the card
+_checks_frozen = np.array([False, True, True, True, True, False, True])
+
+PLAYER = 0
+ENEMY = 1
+
+
+def is_vectorizable(match):
+    """Return True if every card on both boards has an effect the vectorized path can resolve."""
+    for deck in (match.player.cards_on_board, match.enemy.cards_on_board):
+        for card in deck.cards:
+            if type(card) not in effect_kinds:
+                return False
+    return True
+
+
+class BatchBattle:
+    """The combat state of many matches, packed into arrays of shape (matches, 2 sides, board slots)."""
+
+    def __init__(self, matches):
+        self.matches = []  # Matches resolved by the vectorized path, in row order
+        self.scalar_matches = []  # Matches with irregular cards, resolved by the scalar Match methods
+        for match in matches:
+            if is_vectorizable(match):
+                self.matches.append(match)
+            else:
+                self.scalar_matches.append(match)
+
+        rows = len(self.matches)
+        slots = max([len(deck.cards) for match in self.matches
+                     for deck in (match.player.cards_on_board, match.enemy.cards_on_board)], default=0)
+
+        self.count = np.zeros((rows, 2), dtype=np.int64)
+        self.kind = np.zeros((rows, 2, slots), dtype=np.int8)
+        self.card_id = np.zeros((rows, 2, slots), dtype=np.int64)  # 0 for the padding and for cards without an id
+        self.hp = np.zeros((rows, 2, slots), dtype=np.int64)
+        self.attack = np.zeros((rows, 2, slots), dtype=np.int64)
+        self.temp_hp = np.zeros((rows, 2, slots), dtype=np.int64)
+        self.temp_attack = np.zeros((rows, 2, slots), dtype=np.int64)
+        # The params of each card's effect, from its definition: the damage it deals (per friendly unit for Boom), and
+        # the attack and hp it gives
+        self.effect_damage = np.zeros((rows, 2, slots), dtype=np.int64)
+        self.effect_attack = np.zeros((rows, 2, slots), dtype=np.int64)
+        self.effect_hp = np.zeros((rows, 2, slots), dtype=np.int64)
+        self.attack_times = np.zeros((rows, 2, slots), dtype=np.int64)
+        self.shield = np.zeros((rows, 2, slots), dtype=bool)
+        self.frozen = np.zeros((rows, 2, slots), dtype=bool)
+        self.life_steal = np.zeros((rows, 2, slots), dtype=bool)
+        self.owner_hp = np.zeros((rows, 2), dtype=np.int64)
+        self.owner_shield = np.zeros((rows, 2), dtype=bool)
+
+        for row, match in enumerate(self.matches):
+            for side, user in ((PLAYER, match.player), (ENEMY, match.enemy)):
+                self.owner_hp[row, side] = user.hp
+                self.owner_shield[row, side] = user.shield
+                cards = user.cards_on_board.cards
+                self.count[row, side] = len(cards)
+                for slot, card in enumerate(cards):
+                    self.kind[row, side, slot] = effect_kinds[type(card)]
+                    params = card.definition.params
+                    if params:
+                        self.effect_damage[row, side, slot] = params.get('damage', 0)
+                        self.effect_attack[row, side, slot] = params.get('attack', 0)
+                        self.effect_hp[row, side, slot] = params.get('hp', 0)
+                    if card.uuid is not None:
+                        self.card_id[row, side, slot] = card.uuid
+                    self.hp[row, side, slot] = card.hp
+                    self.attack[row, side, slot] = card.attack
+                    self.temp_hp[row, side, slot] = card.temp_hp
+                    self.temp_attack[row, side, slot] = card.temp_attack
+                    self.attack_times[row, side, slot] = card.attack_times
+                    self.shield[row, side, slot] = card.shield
+                    self.frozen[row, side, slot] = card.frozen
+                    self.life_steal[row, side, slot] = card.life_steal
+
+        # Which slots hold a card, used to keep the padding untouched by whole-board effects
+        self.present = np.arange(slots) < self.count[:, :, None]
+
+    def _damage_opposing(self, side: int, slot: int, hits, damage):
+        """Deal damage to the opposing unit in the slot, or to the opposing owner if the slot is empty.
+
+        Shields block the damage without being used up, as in the scalar effects.
+        """
+        other = 1 - side
+        on_card = hits & (self.count[:, other] > slot)
+        on_owner = hits & ~on_card
+        on_card &= ~self.shield[:, other, slot]
+        on_owner &= ~self.owner_shield[:, other]
+        self.hp[on_card, other, slot] -= damage[on_card]
+        self.owner_hp[on_owner, other] -= damage[on_owner]
+
+    def _activate_slot(self, side: int, slot: int):
+        """Activate the effect of the card in the given slot on every board, as Card.activate_effect would."""
+        other = 1 - side
+        acting = self.count[:, side] > slot
+        kind = self.kind[:, side, slot]
+
+        # Frozen cards skip their effect and thaw instead
+        thawing = acting & _checks_frozen[kind] & self.frozen[:, side, slot]
+        self.frozen[thawing, side, slot] = False
+        active = acting & ~thawing
+
+        damage = self.effect_damage[:, side, slot].copy()
+        boom = kind == BOOM
+        damage[boom] *= self.count[boom, side]
+        big_shot = active & (kind == BIG_SHOT)
+        if big_shot.any():
+            damage[big_shot] = (self.attack[big_shot, side] * self.present[big_shot, side]).sum(axis=1)
+        self._damage_opposing(side, slot, active & ((kind == DAMAGE) | boom | big_shot), damage)
+
+        cheer = active & (kind == CHEERLEADER)
+        if cheer.any():
+            self.temp_attack[cheer, side] += self.effect_attack[cheer, side, slot, None] * self.present[cheer, side]
+            self.temp_hp[cheer, side] += self.effect_hp[cheer, side, slot, None] * self.present[cheer, side]
+
+        copycat = active & (kind == COPYCAT)
+        if copycat.any():
+            attack, hp = self.effect_attack[copycat, side, slot, None], self.effect_hp[copycat, side, slot, None]
+            for boosted in (side, other):
+                self.temp_attack[copycat, boosted] += attack * self.present[copycat, boosted]
+                self.temp_hp[copycat, boosted] += hp * self.present[copycat, boosted]
+
+        bank = active & (kind == BANK)
+        self.attack[bank, side, slot] += slot * self.effect_attack[bank, side, slot]
+        self.hp[bank, side, slot] += slot * self.effect_hp[bank, side, slot]
+
+    def _attack_slot(self, side: int, slot: int):
+        """Make the card in the given slot attack on every board, as Card.perform_attack would."""
+        other = 1 - side
+        acting = self.count[:, side] > slot
+
+        thawing = acting & self.frozen[:, side, slot]
+        self.frozen[thawing, side, slot] = False
+        attacking = acting & ~thawing
+
+        on_card = attacking & (self.count[:, other] > slot)
+        on_owner = attacking & ~on_card
+        # Shields block the whole attack and are used up
+        card_blocked = on_card & self.shield[:, other, slot]
+        owner_blocked = on_owner & self.owner_shield[:, other]
+        self.shield[card_blocked, other, slot] = False
+        self.owner_shield[owner_blocked, other] = False
+        on_card &= ~card_blocked
+        on_owner &= ~owner_blocked
+
+        damage = self.attack[:, side, slot] * self.attack_times[:, side, slot]
+        self.hp[on_card, other, slot] -= damage[on_card]
+        self.owner_hp[on_owner, other] -= damage[on_owner]
+
+        life_steal = (on_card | on_owner) & self.life_steal[:, side, slot]
+        self.hp[life_steal, side, slot] += damage[life_steal]
+        self.life_steal[life_steal, side, slot] = False
+
+    def activate_effects(self):
+        """Resolve the EFFECTS phase on every board."""
+        for match in self.scalar_matches:
+            match.activate_effects()
+        for slot in range(self.kind.shape[2]):
+            self._activate_slot(PLAYER, slot)
+            self._activate_slot(ENEMY, slot)
+
+    def perform_attacks(self):
+        """Resolve the ATTACKS phase on every board."""
+        for match in self.scalar_matches:
+            match.perform_attacks()
+        for slot in range(self.kind.shape[2]):
+            self._attack_slot(ENEMY, slot)
+            self._attack_slot(PLAYER, slot)
+
+    def write_back(self):
+        """Copy the resolved state back onto the Card and User objects of the vectorized matches."""
+        hp, attack = self.hp.tolist(), self.attack.tolist()
+        temp_hp, temp_attack = self.temp_hp.tolist(), self.temp_attack.tolist()
+        attack_times = self.attack_times.tolist()
+        shield, frozen, life_steal = self.shield.tolist(), self.frozen.tolist(), self.life_steal.tolist()
+        owner_hp, owner_shield = self.owner_hp.tolist(), self.owner_shield.tolist()
+
+        for row, match in enumerate(self.matches):
+            for side, user in ((PLAYER, match.player), (ENEMY, match.enemy)):
+                user.hp = owner_hp[row][side]
+                user.shield = owner_shield[row][side]
+                for slot, card in enumerate(user.cards_on_board.cards):
+                    card.hp = hp[row][side][slot]
+                    card.attack = attack[row][side][slot]
+                    card.temp_hp = temp_hp[row][side][slot]
+                    card.temp_attack = temp_attack[row][side][slot]
+                    card.attack_times = attack_times[row][side][slot]
+                    card.shield = shield[row][side][slot]
+                    card.frozen = frozen[row][side][slot]
+                    card.life_steal = life_steal[row][side][slot]
+
+
+def resolve_battles(matches):
+    """Resolve the EFFECTS and ATTACKS phases of many matches at once and write the results back."""
+    battle = BatchBattle(matches)
+    battle.activate_effects()
+    battle.perform_attacks()
+    battle.write_back()
+    return battle
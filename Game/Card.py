@@ -1,34 +1,275 @@
 import copy
+import marshal
 import os
 import random
-import uuid
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from enum import Enum, auto
+from itertools import accumulate, chain, count
+from operator import attrgetter
 from typing import Optional
-from PySide6.QtGui import QPixmap, QImage
 
-class Deck:
+from EventLog import log
+
+# Card images are only decoded when a renderer asks for them, so the rules engine (Deck, Match, User, GameManager)
+# can be imported and run headless, without PySide6 installed.
+def load_card_image(name: str):
+    """Return the QImage for the card with the given name, decoding it on first use. See Assets for other sizes."""
+    from Assets import assets  # Deferred so that headless workers never import Qt
+    return assets.image(name)
+
+class IdAllocator:
+    """Hands out card ids: consecutive integers, cheap to hash and compare and easy to pack into arrays.
+
+    GameManager gives each match its own allocator, shared by both users, so the ids of a match only depend on the run's
+    seed and the match number, and (seed, match number, id) names a card across saved replays. Decks made outside of a
+    match draw from card_ids, which is unique within the process.
+    """
+
+    __slots__ = ('next_id',)
+
+    def __init__(self, next_id: int = 1):
+        self.next_id = next_id
+
+    def __call__(self):
+        """Return a new id."""
+        card_id = self.next_id
+        self.next_id = card_id + 1
+        return card_id
+
+
+card_ids = IdAllocator()
+
+
+class CardRegistry:
+    """Index of every card in a match by its id, and of the deck each card is in.
+
+    Decks keep it up to date as cards move, as long as cards are moved with the Deck methods (add, insert, remove,
+    clear, replace and draw) rather than by changing Deck.cards directly.
+    """
+
     def __init__(self):
-        self.cards = []  # Start with an empty list of cards
-        self.owner = None
+        self.cards = {}  # Card id -> card
+        self.decks = {}  # Card id -> deck the card is in
+
+    def track(self, deck):
+        """Index the cards of the deck and keep the index up to date as they move."""
+        deck.registry = self
+        for card in deck.cards:
+            self.cards[card.uuid] = card
+            self.decks[card.uuid] = deck
+
+    def moved(self, card, deck):
+        self.cards[card.uuid] = card
+        self.decks[card.uuid] = deck
+
+    def left(self, card, deck):
+        # Only forget the card if it did not already move on to another deck
+        if self.decks.get(card.uuid) is deck:
+            del self.cards[card.uuid]
+            del self.decks[card.uuid]
+
+    def get(self, card_id):
+        """Return the card with the given id, or None."""
+        return self.cards.get(card_id)
+
+    def locate(self, card_id):
+        """Return the (deck, index) the card with the given id is at, or None. The deck's owner is the user."""
+        deck = self.decks.get(card_id)
+        if deck is None:
+            return None
+        return deck, deck.index(self.cards[card_id])
+
+    def __contains__(self, card_id):
+        return card_id in self.cards
+
+    def __len__(self):
+        return len(self.cards)
+
+
+class Deck:
+    """An ordered collection of cards with constant time membership tests, removal, and insertion at a cursor.
+
+    Removed cards leave a hole (None) in the underlying list, and the holes are only squeezed out the next time the
+    cards are read, so several removals in a row cost a single pass. Inserted cards go into a gap buffer: the cards
+    after the last insertion are held in _tail, in reverse order, so inserting at or near the same place again only
+    moves the cards between the two, as a Royal Summoner chain does while the effects phase walks the board. Reading
+    Deck.cards closes the gap; indexing, len() and iterating the deck do not. Deck.cards gives the cards in order and
+    must not be changed directly; use the methods below.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, ids: Optional[IdAllocator] = None):
+        self._cards = []  # The cards in order up to the gap, with None in place of removed cards
+        self._tail = []  # The cards after the gap, last card first. Only holds cards after an insert
+        self._slots = {}  # id(card) -> index of the card in _cards, or ~index of the card in _tail
+        self._holes = 0  # Number of None entries in _cards and _tail
+        self.shuffled = False  # Whether the deck has been shuffled since cards were last put in, see draw
+        self.owner = None  # The user the deck belongs to, if any
+        self.rng = rng if rng is not None else random.Random()  # Stream used for shuffles and draws
+        self.ids = ids if ids is not None else card_ids  # Allocator for the ids of cards created by effects
+        self.registry = None  # CardRegistry of the match the deck is played in, kept up to date by the methods below
+
+    @property
+    def cards(self):
+        """The cards of the deck, in order."""
+        if self._holes:
+            self._compact()
+        elif self._tail:
+            self._close_gap()
+        return self._cards
+
+    def _compact(self):
+        # Build a new list rather than editing the old one, so that a loop already going over it is not disturbed
+        self._cards = [card for card in chain(self._cards, reversed(self._tail)) if card is not None]
+        self._tail = []
+        self._slots = {id(card): i for i, card in enumerate(self._cards)}
+        self._holes = 0
+
+    def _close_gap(self):
+        cards, slots = self._cards, self._slots
+        for card in reversed(self._tail):
+            if card is not None:
+                slots[id(card)] = len(cards)
+            cards.append(card)
+        self._tail = []
+
+    def _move_gap(self, index: int):
+        # Only called without holes, so every card moved has a slot
+        cards, tail, slots = self._cards, self._tail, self._slots
+        if index < len(cards):
+            for card in reversed(cards[index:]):
+                slots[id(card)] = ~len(tail)
+                tail.append(card)
+            del cards[index:]
+        else:
+            for i in range(index - len(cards)):
+                card = tail.pop()
+                slots[id(card)] = len(cards)
+                cards.append(card)
+
+    def add(self, card):
+        """Put a card at the end of the deck."""
+        if self._tail:
+            self._close_gap()
+        self._slots[id(card)] = len(self._cards)
+        self._cards.append(card)
+        self.shuffled = False
+        if self.registry is not None:
+            self.registry.moved(card, self)
+
+    def insert(self, index: int, card):
+        """Put a card at the given index of the deck. Indices behave as they do for list.insert."""
+        if self._holes:
+            self._compact()
+        size = len(self)
+        if index < 0:
+            index = max(0, index + size)
+        self._move_gap(min(index, size))
+        self._slots[id(card)] = ~len(self._tail)
+        self._tail.append(card)
+        self.shuffled = False
+        if self.registry is not None:
+            self.registry.moved(card, self)
+
+    def remove(self, card):
+        """Take a card out of the deck."""
+        slot = self._slots.pop(id(card), None)
+        if slot is None:
+            raise ValueError(f"{card.name} is not in the deck.")
+        if slot >= 0:
+            self._cards[slot] = None
+        else:
+            self._tail[~slot] = None
+        self._holes += 1
+        if self.registry is not None:
+            self.registry.left(card, self)
+
+    def clear(self):
+        """Take every card out of the deck."""
+        if self.registry is not None:
+            for card in self:
+                self.registry.left(card, self)
+        self._cards = []
+        self._tail = []
+        self._slots = {}
+        self._holes = 0
+
+    def replace(self, cards):
+        """Replace the cards of the deck with the given ones, in order."""
+        self.clear()
+        for card in cards:
+            self.add(card)
+
+    def reassign_id(self, card, card_id):
+        """Give a card of the deck a new id."""
+        if self.registry is not None:
+            self.registry.left(card, self)
+        card.uuid = card_id
+        if self.registry is not None:
+            self.registry.moved(card, self)
+
+    def index(self, card):
+        """Return the index of the card in the deck."""
+        if self._holes:
+            self._compact()
+        slot = self._slots[id(card)]
+        if slot >= 0:
+            return slot
+        return len(self._cards) + len(self._tail) - 1 - ~slot
 
     def shuffle(self):
         """Shuffle the deck of cards."""
-        random.shuffle(self.cards)
+        cards = self.cards
+        self.rng.shuffle(cards)
+        self._slots = {id(card): i for i, card in enumerate(cards)}
+        self.shuffled = True
+
+    def __len__(self):
+        return len(self._cards) + len(self._tail) - self._holes
+
+    def __iter__(self):
+        if self._holes:
+            self._compact()
+        if self._tail:
+            return chain(self._cards, reversed(self._tail))
+        return iter(self._cards)
+
+    def __contains__(self, card):
+        return id(card) in self._slots
+
+    def __getstate__(self):
+        # _slots is keyed by id(), which means nothing in another process
+        state = self.__dict__.copy()
+        del state['_slots']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._slots = {id(card): i for i, card in enumerate(self._cards) if card is not None}
+        self._slots.update((id(card), ~i) for i, card in enumerate(self._tail) if card is not None)
+
+    def __getitem__(self, index):
+        if self._holes or not self._tail or isinstance(index, slice):
+            return self.cards[index]
+        if index < 0:
+            index += len(self)
+        if 0 <= index < len(self._cards):
+            return self._cards[index]
+        tail_index = len(self._cards) + len(self._tail) - 1 - index
+        if not 0 <= tail_index < len(self._tail):
+            raise IndexError("Deck index out of range")
+        return self._tail[tail_index]
+
+    def facing(self, position: int):
+        """Return the card at the position, or the owner of the deck if there is none. This is who a unit at that
+        position of the other board attacks and targets."""
+        if position >= len(self):
+            return self.owner
+        return self[position]
 
     def randomiser(self, lowest_tier: int, highest_tier: int):
-        # print(f"### - Lowest tier: {lowest_tier}, Highest tier: {highest_tier}")
-        if lowest_tier < 1:
-            lowest_tier = 1
-        if highest_tier < 1:
-            highest_tier = 1
-        if random.random() < 0.05 and highest_tier > 3:
-            chosen_card = random.choice(
-                [card for card in cards_list if card.tier <= highest_tier and card.card_class.name == "RARE"])
-        else:
-            chosen_card = random.choice([card for card in cards_list if
-                                         card.tier >= lowest_tier and card.tier <= highest_tier and card.card_class.name != "RARE"])
-        return chosen_card
+        """Return a random card prototype between the given tiers, with a small chance of a rare card instead."""
+        return catalog_index.draw(lowest_tier, highest_tier, self.rng)
 
     # Return a list of copies of all cards in the game
     def get_all_cards(self):
@@ -36,10 +277,23 @@ class Deck:
 
     def draw(self):
         """Draw a card from the deck, removing it from the deck."""
-        if not self.cards:
+        if not len(self):
             raise ValueError("No cards left in the deck!")
-        self.shuffle()
-        return self.cards.pop()
+        # A shuffled deck stays shuffled as cards are taken out of it, so it only needs shuffling again once new cards
+        # have been put in
+        if not self.shuffled:
+            self.shuffle()
+        elif self._tail:
+            self._close_gap()
+        cards = self._cards
+        card = cards.pop()
+        while card is None:
+            self._holes -= 1
+            card = cards.pop()
+        del self._slots[id(card)]
+        if self.registry is not None:
+            self.registry.left(card, self)
+        return card
 
     def __str__(self):
         """Return a string of the current deck information."""
@@ -50,6 +304,85 @@ class Deck:
             i += 1
         return deck_info
 
+
+# Versions handed out to boards, see Board
+_board_versions = count()
+
+
+class Board(Deck):
+    """The units a user has in play. A Deck that also keeps running totals for effects that look at the whole board.
+
+    total_hp and total_attack are updated as cards come and go, and by the cards themselves when their stats change,
+    so, like len(), they are O(1) to read. boost_temp_stats raises the temp stats of every card on the board in O(1)
+    too, as the temp stats of a card are kept relative to the boosts of the board it is on.
+
+    version changes every time a card enters, leaves or moves, and no two boards ever share one, so a version stands
+    for the exact order of cards on the board. Match keys its effect plans by it.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, ids: Optional[IdAllocator] = None):
+        super().__init__(rng, ids)
+        self.total_hp = 0  # Sum of the hp of the cards on the board
+        self.total_attack = 0  # Sum of the attack of the cards on the board
+        self.temp_hp_boost = 0  # Added to the temp hp of every card on the board by boost_temp_stats
+        self.temp_attack_boost = 0  # Added to the temp attack of every card on the board by boost_temp_stats
+        self.version = next(_board_versions)
+
+    def _enter(self, card):
+        self.version = next(_board_versions)
+        card._temp_hp -= self.temp_hp_boost
+        card._temp_attack -= self.temp_attack_boost
+        card.board = self
+        self.total_hp += card._hp
+        self.total_attack += card._attack
+
+    def _leave(self, card):
+        self.version = next(_board_versions)
+        self.total_hp -= card._hp
+        self.total_attack -= card._attack
+        card._temp_hp += self.temp_hp_boost
+        card._temp_attack += self.temp_attack_boost
+        card.board = None
+
+    def boost_temp_stats(self, attack: int, hp: int):
+        """Add to the temp attack and temp hp of every card on the board. Cards put on it afterwards are not boosted."""
+        self.temp_attack_boost += attack
+        self.temp_hp_boost += hp
+
+    def add(self, card):
+        super().add(card)
+        self._enter(card)
+
+    def insert(self, index: int, card):
+        super().insert(index, card)
+        self._enter(card)
+
+    def remove(self, card):
+        super().remove(card)
+        self._leave(card)
+
+    def clear(self):
+        for card in self:
+            self._leave(card)
+        super().clear()
+        self.temp_hp_boost = self.temp_attack_boost = 0
+        self.version = next(_board_versions)
+
+    def shuffle(self):
+        super().shuffle()
+        self.version = next(_board_versions)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # Versions are only unique within a process, so an unpickled board gets a new one
+        self.version = next(_board_versions)
+
+    def draw(self):
+        card = super().draw()
+        self._leave(card)
+        return card
+
+
 class CardClass(Enum):
     BRAWLER = auto()
     ARCHER = auto()
@@ -63,18 +396,66 @@ class CardColor(Enum):
     YELLOW = auto()
     RED = auto()
 
-class Card(ABC):
-    """An abstract base class representing a card in the game.
+# The color of the cards of each tier, from tier 1 up
+_tier_colors = tuple(CardColor)
+
+# Bits of Card.flags
+SHIELD = 1
+FROZEN = 2
+LIFE_STEAL = 4
+
+
+class CardDefinition:
+    """The static data of a card, held once and shared by the prototype in cards_list and every copy made of it.
 
     Attributes:
         name (str): The name of the card.
         description (str): The description of the card.
         tier (int): The tier of the card (1 to 5)
+        hp (int): The base health points of the card.
+        attack (int): The base attack points of the card.
+        card_class (CardClass): The class of the card (Brawler, Archer, Mage, Rare).
+        color (CardColor): The color of the card, which follows from its tier.
+        effect_description (str): The description of the card's special effect.
+        params (dict): The numbers the card's effect works with, such as how much damage it deals.
+    """
+
+    __slots__ = ('name', 'description', 'tier', 'hp', 'attack', 'card_class', 'color', 'effect_description', 'params')
+
+    def __init__(self, name: str, description: str, tier: int, hp: int, attack: int, card_class: CardClass, effect_description: Optional[str] = "No special effect", params: Optional[dict] = None):
+        # The values are checked once, by check_definition when the catalog is compiled, and not on every construction
+        self.name = name
+        self.description = description
+        self.tier = tier
+        self.hp = hp
+        self.attack = attack
+        self.card_class = card_class
+        self.color = _tier_colors[tier - 1]
+        self.effect_description = effect_description
+        self.params = params if params is not None else {}
+
+    @property
+    def image(self):
+        """The card's image. Only renderers should touch this, as it is what pulls in Qt."""
+        return load_card_image(self.name)
+
+
+class Card(ABC):
+    """An abstract base class representing a card in the game.
+
+    A card only holds what changes during a match. Everything else lives in its CardDefinition, which every copy of the
+    card shares, and is read through properties.
+
+    Attributes:
+        uuid (int): The id of this copy of the card, from an IdAllocator.
+        definition (CardDefinition): The static data of the card.
         hp (int): The health points of the card.
         attack (int): The attack points of the card.
-        card_class (CardClass): The class of the card (Brawler, Archer, Mage, Rare).
-        effect_description (str, optional): The description of the card's special effect.
-        image (QPixmap): The image of the card.
+        temp_hp (int), temp_attack (int): The stats the card goes back to, see reset_temp_stats.
+        board (Board): The board the card is on, if any, whose totals its stat changes keep up to date.
+        attack_times (int): How many times the unit attacks per turn.
+        flags (int): The SHIELD, FROZEN and LIFE_STEAL status bits, also readable as shield, frozen and life_steal.
+        name, description, tier, card_class, color, effect_description, image: From the definition.
 
     Methods:
         activate_effect(): Method to activate the card's special effect.
@@ -82,54 +463,142 @@ class Card(ABC):
         die(): Method to handle the card's death.
     """
 
-    def __init__(self, name: str, description: str, tier: int, hp: int, attack: int, card_class: CardClass, effect_description: Optional[str] = "No special effect"):
-        if not isinstance(name, str):
-            raise TypeError("Name must be a string.")
-        if not isinstance(description, str):
-            raise TypeError("Description must be a string.")
-        if not isinstance(tier, int):
-            raise TypeError("Tier must be an integer.")
-        if not (1 <= tier <= 5):
-            raise ValueError("Tier must be between 1 and 5.")
-        if not isinstance(hp, int):
-            raise TypeError("HP must be an integer.")
-        if not isinstance(attack, int):
-            raise TypeError("Attack must be an integer.")
-        if not isinstance(card_class, CardClass):
-            raise TypeError("Card class must be an instance of CardClass.")
-        if not isinstance(effect_description, str):
-            raise TypeError("Effect description must be a string.")
+    # On a board, _temp_hp and _temp_attack are relative to the board's temp stat boosts, see Board.boost_temp_stats
+    __slots__ = ('uuid', 'definition', '_hp', '_attack', '_temp_hp', '_temp_attack', 'attack_times', 'flags', 'board')
+
+    default_params = {}  # The effect's params and their values when the catalog does not give them
 
+    def __init__(self, name: str, description: str, tier: int, hp: int, attack: int, card_class: CardClass, effect_description: Optional[str] = "No special effect", params: Optional[dict] = None):
         self.uuid = None
-        self.name = name
-        self.description = description
-        self.tier = tier
-        self.hp = hp
-        self.attack = attack
-        self.card_class = CardClass(card_class)
-        self.color = CardColor(list(CardColor)[self.tier-1])
-        self.effect_description = effect_description
-        # Correctly form the path to the image
-        image_path = os.path.join(os.getcwd(), 'img', f'{self.name.lower()}.png')
-        self.image = QImage(str(image_path))
-        # if self.image.isNull():
-        #     print(f"Failed to load image from {image_path}")
-        # else:
-        #     print(f"Image loaded successfully from {image_path}")
+        self.definition = CardDefinition(name, description, tier, hp, attack, card_class, effect_description,
+                                         {**self.default_params, **(params or {})})
+        self.board = None
+        self._hp = hp
+        self._attack = attack
 
         # Status effects
         self.attack_times = 1  # How many times the unit attacks per turn
-        self.shield = False  # Whether the unit can take the next instance of damage
-        self.life_steal = False  # Whether the unit heals for the amount of damage it deals
-        self.frozen = False  # Whether the unit is frozen and cannot attack or use its effect
+        self.flags = 0  # Shield, frozen and life steal, all off
 
         # Temporary stats pointing to the original stats, for effects that last for the duration of the turn
-        self.temp_attack = self.attack
-        self.temp_hp = self.hp
+        self._temp_attack = attack
+        self._temp_hp = hp
+
+    def __copy__(self):
+        """Return a new copy of the card sharing its definition, without going through copy's generic machinery.
+
+        The copy is not on any board yet.
+        """
+        card = object.__new__(type(self))
+        card.uuid = self.uuid
+        card.definition = self.definition
+        card.board = None
+        card._hp = self._hp
+        card._attack = self._attack
+        card._temp_hp, card._temp_attack = self._temp_hp, self._temp_attack
+        if self.board is not None:
+            card._temp_hp += self.board.temp_hp_boost
+            card._temp_attack += self.board.temp_attack_boost
+        card.attack_times = self.attack_times
+        card.flags = self.flags
+        return card
+
+    def _set_hp(self, value: int):
+        board = self.board
+        if board is not None:
+            board.total_hp += value - self._hp
+        self._hp = value
+
+    def _set_attack(self, value: int):
+        board = self.board
+        if board is not None:
+            board.total_attack += value - self._attack
+        self._attack = value
+
+    # Stats are read far more often than they change, so they are read through attrgetter, without a Python call
+    hp = property(attrgetter('_hp'), _set_hp, doc="The health points of the card.")
+    attack = property(attrgetter('_attack'), _set_attack, doc="The attack points of the card.")
+
+    @property
+    def temp_hp(self):
+        board = self.board
+        return self._temp_hp + board.temp_hp_boost if board is not None else self._temp_hp
+
+    @temp_hp.setter
+    def temp_hp(self, value: int):
+        board = self.board
+        self._temp_hp = value - board.temp_hp_boost if board is not None else value
+
+    @property
+    def temp_attack(self):
+        board = self.board
+        return self._temp_attack + board.temp_attack_boost if board is not None else self._temp_attack
+
+    @temp_attack.setter
+    def temp_attack(self, value: int):
+        board = self.board
+        self._temp_attack = value - board.temp_attack_boost if board is not None else value
+
+    @property
+    def name(self):
+        return self.definition.name
+
+    @property
+    def description(self):
+        return self.definition.description
+
+    @property
+    def tier(self):
+        return self.definition.tier
+
+    @property
+    def card_class(self):
+        return self.definition.card_class
+
+    @property
+    def color(self):
+        return self.definition.color
+
+    @property
+    def effect_description(self):
+        return self.definition.effect_description
+
+    @property
+    def image(self):
+        """The card's image. Only renderers should touch this, as it is what pulls in Qt."""
+        return load_card_image(self.definition.name)
+
+    @property
+    def shield(self):
+        """Whether the unit can take the next instance of damage."""
+        return bool(self.flags & SHIELD)
+
+    @shield.setter
+    def shield(self, value: bool):
+        self.flags = self.flags | SHIELD if value else self.flags & ~SHIELD
+
+    @property
+    def frozen(self):
+        """Whether the unit is frozen and cannot attack or use its effect."""
+        return bool(self.flags & FROZEN)
+
+    @frozen.setter
+    def frozen(self, value: bool):
+        self.flags = self.flags | FROZEN if value else self.flags & ~FROZEN
+
+    @property
+    def life_steal(self):
+        """Whether the unit heals for the amount of damage it deals."""
+        return bool(self.flags & LIFE_STEAL)
+
+    @life_steal.setter
+    def life_steal(self, value: bool):
+        self.flags = self.flags | LIFE_STEAL if value else self.flags & ~LIFE_STEAL
 
     @abstractmethod
-    # Optional attribute "target" for cards that need to target a specific card
-    def activate_effect(self, position: int, friendly_board: Deck, enemy_board: Deck):
+    # Optional attribute "target" for cards that need to target a specific card. Left as None, cards that target the
+    # opposing unit look it up themselves; Match passes it in from its effect plan, which has already resolved it
+    def activate_effect(self, position: int, friendly_board: Deck, enemy_board: Deck, target=None):
         """Method to activate the card's special effect"""
         pass
 
@@ -138,47 +607,56 @@ class Card(ABC):
         self.attack = self.temp_attack
         self.hp = self.temp_hp
 
-    def perform_attack(self, position: int, enemy_board: Deck):
+    def snapshot(self):
+        """Return the card's mutable state as a compact tuple. The static card data is not copied."""
+        return self.uuid, self.hp, self.attack, self.temp_hp, self.temp_attack, self.attack_times, self.flags
+
+    def restore(self, state: tuple):
+        """Put the card back into a state returned by snapshot."""
+        self.uuid, self.hp, self.attack, self.temp_hp, self.temp_attack, self.attack_times, self.flags = state
+
+    def perform_attack(self, position: int, enemy_board: Deck, target=None):
         self.check_hp()
         """Method to perform an attack on a target"""
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
 
         # Check if the card is frozen or has a shield
         if self.frozen:
-            print(f"DEBUG {self.name}: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug(self.name, f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
         if target.shield:
-            print(f"DEBUG {self.name}: Target {target.name} has a shield and takes no damage.")
+            if log.debug_enabled:
+                log.debug(self.name, f"Target {target.name} has a shield and takes no damage.")
             target.shield = False
             return
 
         # Perform the attack
         damage_dealt = 0
+        attack = self.attack
         for i in range(self.attack_times):
-            damage_dealt += self.attack
-            print(f"DEBUG {self.name}: Attacks {target.name} for {self.attack} damage! Run: {i+1}/{self.attack_times}")
-            target.hp -= self.attack
-            print(f"DEBUG {target.name}: HP: {target.hp}")
+            damage_dealt += attack
+            target.hp -= attack
+            if log.debug_enabled:
+                log.debug(self.name, f"Attacks {target.name} for {attack} damage! Run: {i+1}/{self.attack_times}",
+                          target_hp=target.hp)
 
         if self.life_steal:
             self.hp += damage_dealt
-            print(f"DEBUG {self.name}: Heals for {damage_dealt} HP due to life steal.")
             self.life_steal = False
-            print(f"DEBUG {self.name}: Disabled life steal.")
+            if log.debug_enabled:
+                log.debug(self.name, f"Heals for {damage_dealt} HP due to life steal. Disabled life steal.")
 
         # target.check_hp()
         target = None
 
     def die(self):
         """Method to handle the card's death"""
-        print(f"{self.name} has died.")
+        if log.info_enabled:
+            log.info(self.name, "Has died.")
         # Destroy object
         # del self
 
@@ -203,186 +681,211 @@ class Card(ABC):
 
 # Cards without effects need to be instantiated using SimpleCard
 class SimpleCard(Card):
-    def activate_effect(self, position: int, friendly_board: Deck, enemy_board: Deck):
+    __slots__ = ()
+
+    def activate_effect(self, position: int, friendly_board: Deck, enemy_board: Deck, target=None):
         """This card has no special effect."""
         pass
 
 # Specific card implementations for special effects
 class Grag(Card):
-    def activate_effect(self, position: int, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Grag: Add 2 health to the unit to the left")
+    __slots__ = ()
+    default_params = {'heal': 2}
+
+    def activate_effect(self, position: int, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Grag", f"Add {self.definition.params['heal']} health to the unit to the left")
         if self.frozen:
-            print(f"DEBUG Grag: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Grag", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
         if position > 0:
-            target = friendly_board.cards[position-1]
-            target.hp += 2
+            target = friendly_board[position-1]
+            target.hp += self.definition.params['heal']
         # target.check_hp()
 
+# Pew and Pew Pew
 class Pew(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
+    __slots__ = ()
+    default_params = {'damage': 2}
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
         if self.frozen:
-            print(f"DEBUG Pew: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug(self.name, f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        print(f"DEBUG Pew: Deal 2 damage to the unit in front of it")
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        if log.debug_enabled:
+            log.debug(self.name, f"Deal {self.definition.params['damage']} damage to the unit in front of it")
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         if not target.shield:
-            target.hp -= 2
+            target.hp -= self.definition.params['damage']
         # target.check_hp()
 
 class Rasmus(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Rasmus: Make the unit to the left attack again")
+    __slots__ = ()
+    default_params = {'attacks': 1}
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Rasmus", "Make the unit to the left attack again")
         if self.frozen:
-            print(f"DEBUG Rasmus: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Rasmus", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
         if position > 0:
-            target = friendly_board.cards[position-1]
-            target.attack_times += 1
+            target = friendly_board[position-1]
+            target.attack_times += self.definition.params['attacks']
 
 class Bank(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Bank: For every unit to his left, Bank gains 1 attack and 1 HP")
-        if self.frozen:
-            print(f"DEBUG Bank: Target {self.name} is frozen and cannot attack.")
-            self.frozen = False
-            return
-        for i in range(position):
-            self.attack += 1
-            self.hp += 1
+    __slots__ = ()
+    default_params = {'attack': 1, 'hp': 1}
 
-class PewPew(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        params = self.definition.params
+        if log.debug_enabled:
+            log.debug("Bank", f"For every unit to his left, Bank gains {params['attack']} attack and {params['hp']} HP")
         if self.frozen:
-            print(f"DEBUG Pew Pew: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Bank", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        print(f"DEBUG Pew Pew: Deal 2 damage to the opposing unit")
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
-        if not target.shield:
-            target.hp -= 2
-        # target.check_hp()
-
+        self.attack += position * params['attack']
+        self.hp += position * params['hp']
 
 class Boom(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Boom: Shoot opposing unit for 1 damage for each friendly unit on the board")
+    __slots__ = ()
+    default_params = {'damage': 1}
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Boom", f"Shoot opposing unit for {self.definition.params['damage']} damage for each friendly "
+                              "unit on the board")
         if self.frozen:
-            print(f"DEBUG Boom: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Boom", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         if not target.shield:
-            target.hp -= len(friendly_board.cards)
+            target.hp -= len(friendly_board) * self.definition.params['damage']
         # target.check_hp()
 
 class Malik(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Malik: Unit to the left does not take the next instance of damage")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Malik", "Unit to the left does not take the next instance of damage")
         if self.frozen:
-            print(f"DEBUG Malik: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Malik", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        target = friendly_board.cards[position-1]
+        target = friendly_board[position-1]
         target.shield = True
 
 class Brap(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Brap: Attack the opposing unit.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Brap", "Attack the opposing unit.")
         # Doesn't need to check if frozen because attack does
-        self.perform_attack(position, enemy_board)
+        self.perform_attack(position, enemy_board, target)
 
 class Cablooey(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Cablooey: Shoot opposing unit for 50% of its HP.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Cablooey", "Shoot opposing unit for 50% of its HP.")
         if self.frozen:
-            print(f"DEBUG Cablooey: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Cablooey", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         if not target.shield:
             target.hp -= target.hp // 2
         # target.check_hp()
 
 class Catapulty(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Catapulty: Shoot the opposing unit for its own attack value.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Catapulty", "Shoot the opposing unit for its own attack value.")
         if self.frozen:
-            print(f"DEBUG Catapulty: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Catapulty", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
-            if not target.shield:
-                target.hp -= target.attack
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
+        # Only units fire back; the enemy player is left alone
+        if target is not enemy_board.owner and not target.shield:
+            target.hp -= target.attack
 
         # target.check_hp()
 
 class Nomnom(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Nomnom: "
-              f"Unit to the left gains life steal for the duration of the turn. "
-              f"Life steal heals the unit for the amount of damage it deals.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Nomnom", "Unit to the left gains life steal for the duration of the turn. "
+                                "Life steal heals the unit for the amount of damage it deals.")
         if self.frozen:
-            print(f"DEBUG Nomnom: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Nomnom", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        target = friendly_board.cards[position-1]
+        target = friendly_board[position-1]
         target.life_steal = True
 
 class TimeLord(Card):
-    def __init__(self, name: str, description: str, tier: int, hp: int, attack: int, card_class: CardClass, effect_description: str):
-        super().__init__(name, description, tier, hp, attack, card_class, effect_description)
+    __slots__ = ('condition', 'temp_enemy', 'turns_active')
+
+    def __init__(self, name: str, description: str, tier: int, hp: int, attack: int, card_class: CardClass, effect_description: str, params: Optional[dict] = None):
+        super().__init__(name, description, tier, hp, attack, card_class, effect_description, params)
         self.condition = False
         self.temp_enemy = None
         self.turns_active = 0
 
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Time Lord: "
-              f"If both this unit and the opposing unit are alive by the next turn, destroy the opposing unit.")
+    def __copy__(self):
+        card = super().__copy__()
+        card.condition, card.temp_enemy, card.turns_active = self.condition, self.temp_enemy, self.turns_active
+        return card
+
+    def snapshot(self):
+        # Time Lord also remembers the unit it is waiting to destroy
+        return super().snapshot() + (self.condition, self.temp_enemy, self.turns_active)
+
+    def restore(self, state: tuple):
+        super().restore(state[:-3])
+        self.condition, self.temp_enemy, self.turns_active = state[-3:]
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Time Lord", "If both this unit and the opposing unit are alive by the next turn, destroy the opposing unit.")
         if self.frozen:
-            print(f"DEBUG Time Lord: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Time Lord", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         self.turns_active += 1
         if self.temp_enemy is target and self.turns_active == 1:
             target.hp = 0
@@ -392,70 +895,72 @@ class TimeLord(Card):
             self.turns_active = 0
 
 class BigShot(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Big Shot: Shoot opposing unit for the combined attack of all friendly units on the board.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Big Shot", "Shoot opposing unit for the combined attack of all friendly units on the board.")
         if self.frozen:
-            print(f"DEBUG Big Shot: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Big Shot", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        total_attack = 0
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
-        for card in friendly_board.cards:
-            total_attack += card.attack
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         if not target.shield:
-            target.hp -= total_attack
+            target.hp -= friendly_board.total_attack
         # target.check_hp()
 
 class IceCube(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Ice Cube: Freeze the opposing unit for the next turn.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Ice Cube", "Freeze the opposing unit for the next turn.")
         if self.frozen:
-            print(f"DEBUG Ice Cube: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Ice Cube", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         target.frozen = True
 
 class Cheerleader(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Cheerleader: Give all friendly units on the board "
-              f"+3 attack and +3 HP for the duration of the turn.")
+    __slots__ = ()
+    default_params = {'attack': 3, 'hp': 3}
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        params = self.definition.params
+        if log.debug_enabled:
+            log.debug("Cheerleader", f"Give all friendly units on the board +{params['attack']} attack and "
+                                     f"+{params['hp']} HP for the duration of the turn.")
         if not self.frozen:
-            for card in friendly_board.cards:
-                card.temp_attack += 3
-                card.temp_hp += 3
+            friendly_board.boost_temp_stats(params['attack'], params['hp'])
         else:
-            print(f"DEBUG Cheerleader: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Cheerleader", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
 
 class HungryAssassin(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Hungry Assassin: Sacrifice as much HP as the opposing unit's HP to destroy it.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Hungry Assassin", "Sacrifice as much HP as the opposing unit's HP to destroy it.")
         if self.frozen:
-            print(f"DEBUG Hungry Assassin: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Hungry Assassin", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         if target.shield:
-            print(f"DEBUG Hungry Assassin: Target {target.name} has a shield and takes no damage.")
+            if log.debug_enabled:
+                log.debug("Hungry Assassin", f"Target {target.name} has a shield and takes no damage.")
             target.shield = False
             return
         if self.hp >= target.hp:
@@ -464,124 +969,265 @@ class HungryAssassin(Card):
         # target.check_hp()
 
 class Flea(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Flea: Deals fatal damage to the first target.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Flea", "Deals fatal damage to the first target.")
         if self.frozen:
-            print(f"DEBUG Flea: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Flea", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         target.hp = 0
         # We do not want the target to check its HP we actually want it to just go to 0 HP
 
 
 class BigGunga(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Big Gunga: This unit attacks the opposing unit. If the opposing unit dies from this attack, "
-              f"gain half its stats.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Big Gunga", "This unit attacks the opposing unit. If the opposing unit dies from this attack, "
+                                   "gain half its stats.")
         if self.frozen:
-            print(f"DEBUG Big Gunga: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Big Gunga", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
         if not target.shield:
-            self.perform_attack(position, enemy_board)
-            if target.hp <= 0:
+            self.perform_attack(position, enemy_board, target)
+            # Only units have stats to take; beating the enemy player gives nothing
+            if target.hp <= 0 and target is not enemy_board.owner:
                     self.hp += target.hp // 2
                     self.attack += target.attack // 2
-                    print(f"DEBUG Big Gunga: Gained {target.hp // 2} HP and "
-                          f"{target.attack // 2} attack from {target.name}.")
+                    if log.debug_enabled:
+                        log.debug("Big Gunga", f"Gained {target.hp // 2} HP and "
+                                               f"{target.attack // 2} attack from {target.name}.")
         # target.check_hp()
 
 
 class Sender(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Sender: Shoot the opposing unit for the combined attack and HP values of the unit to the left.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Sender", "Shoot the opposing unit for the combined attack and HP values of the unit to the left.")
         if self.frozen:
-            print(f"DEBUG Sender: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Sender", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
-        # Check if the target is the enemy player or a card
-        target = None
-        # If the position is out of bounds, attack the enemy player
-        if position >= len(enemy_board.cards):
-            target = enemy_board.owner
-        else:
-            target = enemy_board.cards[position]
-        left = friendly_board.cards[position-1]
+        # The unit in front of this one, or the enemy player if there is none
+        if target is None:
+            target = enemy_board.facing(position)
+        left = friendly_board[position-1]
         if not target.shield:
             target.hp -= left.attack + left.hp
         # target.check_hp()
 
 class RoyalSummoner(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Royal Summoner: Summon the unit to his left and add it to his right on the board.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Royal Summoner", "Summon the unit to his left and add it to his right on the board.")
         if self.frozen:
-            print(f"DEBUG Royal Summoner: Target {self.name} is frozen and cannot attack.")
+            if log.debug_enabled:
+                log.debug("Royal Summoner", f"Target {self.name} is frozen and cannot attack.")
             self.frozen = False
             return
         if position > 0:
-            left = copy.copy(friendly_board.cards[position-1])
-            print(f"DEBUG Royal Summoner: Summoned {left.name}.")
-            left.uuid = uuid.uuid4()
-            print(f"DEBUG Royal Summoner: Left's UUID: {left.uuid}.")
-            friendly_board.cards.insert(position+1, left)
+            left = copy.copy(friendly_board[position-1])
+            left.uuid = friendly_board.ids()
+            if log.debug_enabled:
+                log.debug("Royal Summoner", f"Summoned {left.name}.", uuid=left.uuid)
+            friendly_board.insert(position+1, left)
 
 class Copycat(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Copycat: Gain 1 attack and 1 HP for every unit on the board.")
+    __slots__ = ()
+    default_params = {'attack': 1, 'hp': 1}
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        params = self.definition.params
+        if log.debug_enabled:
+            log.debug("Copycat", f"Gain {params['attack']} attack and {params['hp']} HP for every unit on the board.")
         # Permanently means for the duration of the match, not like forever
-        for card in friendly_board.cards:
-            card.temp_attack += 1
-            card.temp_hp += 1
-        for card in enemy_board.cards:
-            card.temp_attack += 1
-            card.temp_hp += 1
+        friendly_board.boost_temp_stats(params['attack'], params['hp'])
+        enemy_board.boost_temp_stats(params['attack'], params['hp'])
 
 class UnceasingVoid(Card):
-    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck):
-        print(f"DEBUG Void: If this unit is on the board, you cannot die.")
+    __slots__ = ()
+
+    def activate_effect(self, position, friendly_board: Deck, enemy_board: Deck, target=None):
+        if log.debug_enabled:
+            log.debug("Void", "If this unit is on the board, you cannot die.")
         if friendly_board.owner.hp <= 0:
             friendly_board.owner.hp = 1
 
 
+# Effect handlers by the name card catalogs give them by
+effect_types = {card_type.__name__: card_type for card_type in (
+    SimpleCard, Grag, Pew, Rasmus, Bank, Boom, Malik, Brap, Cablooey, Catapulty, Nomnom, TimeLord, BigShot, IceCube,
+    Cheerleader, HungryAssassin, Flea, BigGunga, Sender, RoyalSummoner, Copycat, UnceasingVoid)}
+
+# The catalog the game is played with. Point CARDMASTER_CATALOG at another file to play with a variant of it
+CATALOG_PATH = os.environ.get('CARDMASTER_CATALOG',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cards.json'))
+_CATALOG_FORMAT = 1  # Bumped whenever the compiled form changes, so that old caches are not read
+
+
+def check_definition(entry: dict):
+    """Check a card of a catalog file and return it as the tuple the compiled catalog holds.
+
+    Raises TypeError or ValueError naming the card if anything about it is wrong.
+    """
+    name = entry.get('name')
+    if not isinstance(name, str):
+        raise TypeError("Name must be a string.")
+    description = entry.get('description')
+    if not isinstance(description, str):
+        raise TypeError(f"{name}: Description must be a string.")
+    tier = entry.get('tier')
+    if not isinstance(tier, int):
+        raise TypeError(f"{name}: Tier must be an integer.")
+    if not (1 <= tier <= 5):
+        raise ValueError(f"{name}: Tier must be between 1 and 5.")
+    hp = entry.get('hp')
+    if not isinstance(hp, int):
+        raise TypeError(f"{name}: HP must be an integer.")
+    attack = entry.get('attack')
+    if not isinstance(attack, int):
+        raise TypeError(f"{name}: Attack must be an integer.")
+    card_class = entry.get('class')
+    if card_class not in CardClass.__members__:
+        raise ValueError(f"{name}: Card class must be one of {', '.join(CardClass.__members__)}.")
+    effect_description = entry.get('effect_description', "No special effect")
+    if not isinstance(effect_description, str):
+        raise TypeError(f"{name}: Effect description must be a string.")
+    effect = entry.get('effect', 'SimpleCard')
+    if effect not in effect_types:
+        raise ValueError(f"{name}: Unknown effect {effect!r}.")
+    params = entry.get('params', {})
+    default_params = effect_types[effect].default_params
+    for param, value in params.items():
+        if param not in default_params:
+            raise ValueError(f"{name}: {effect} has no param {param!r}.")
+        if not isinstance(value, int):
+            raise TypeError(f"{name}: Param {param!r} must be an integer.")
+    return name, description, tier, hp, attack, card_class, effect_description, effect, params
+
+
+def compile_catalog(path: str):
+    """Read and check a catalog file, returning its cards in the compact form that gets cached."""
+    import json  # Deferred, as a cached catalog is loaded without it
+    with open(path, 'r', encoding='utf-8') as file:
+        entries = json.load(file)
+    return tuple(check_definition(entry) for entry in entries)
+
+
+def _catalog_cache_path(path: str):
+    directory, file_name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, '__pycache__', f'{file_name}.marshal')
+
+
+def load_catalog(path: str = CATALOG_PATH):
+    """Return the card prototypes of a catalog file, in the order it lists them.
+
+    The checked catalog is cached next to the file with marshal, much like Python caches compiled modules, and is
+    compiled again whenever the file's size or modification time no longer match the cache.
+    """
+    stat = os.stat(path)
+    header = (_CATALOG_FORMAT, stat.st_mtime_ns, stat.st_size)
+    cache_path = _catalog_cache_path(path)
+    compiled = None
+    try:
+        with open(cache_path, 'rb') as file:
+            # One read and loads, as marshal.load reads a file in small pieces
+            cached_header, cached = marshal.loads(file.read())
+        if cached_header == header:
+            compiled = cached
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    if compiled is None:
+        compiled = compile_catalog(path)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Written aside and moved into place, so a process reading the cache never sees half of it
+            temp_path = f'{cache_path}.{os.getpid()}'
+            with open(temp_path, 'wb') as file:
+                marshal.dump((header, compiled), file)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass  # A read-only install just compiles the catalog every time
+    return [effect_types[effect](name, description, tier, hp, attack, CardClass[card_class], effect_description,
+                                 params)
+            for name, description, tier, hp, attack, card_class, effect_description, effect, params in compiled]
+
+
 # List of all cards
-cards_list = [
-    SimpleCard("Greg", "Ooga booga", 1, 1, 5, CardClass.BRAWLER),
-    SimpleCard("Grog", "Unga bunga", 1, 4, 2, CardClass.BRAWLER),
-    Grag("Grag", "Gonk gonk", 1, 1, 2, CardClass.BRAWLER, "Heals the unit to his left by 2 HP out of the kindness of his heart"),
-    Pew("Pew", "I am an archer. I go pew. Just once.", 1, 1, 1, CardClass.ARCHER, "Deals 2 damage to the unit in front of him. Pew!"),
-    Rasmus("Rasmus", "I am Rasmus the Almighty. Tremble before me.", 1, 2, 2, CardClass.MAGE, "Inspires the unit to his left to attack twice."),
-    SimpleCard("Bonk", "Bonk bonk", 2, 5, 6, CardClass.BRAWLER),
-    Bank("Bank", "Cha-ching!", 2, 3, 3, CardClass.BRAWLER, "For every to his left, Bank gains 1 attack and 1 HP. We makin' bank!"),
-    PewPew("Pew Pew", "I am an archer. I go pew pew. Simple as that.", 2, 1, 2, CardClass.ARCHER, "Damages the opposing unit twice, for 2 damage each time. Pew pew!"),
-    Boom("Boom", "In contrast to my name, I am a very calm and collected individual.", 2, 1, 1, CardClass.ARCHER, "For each friendly unit on the board, deal 1 damage to the opposing unit. Boom!"),
-    Malik("Malik", "There's only one direction to go from here...", 2, 3, 1, CardClass.MAGE, "The unit to his left does not take the next instance of damage."),
-    Brap("Brap", "Brap brap, hit 'em with the one-two!", 3, 12, 2, CardClass.BRAWLER, "Brap's quick attacks make him attack an extra time."),
-    Cablooey("Cablooey", "Oh you're about to feel it now...", 3, 7, 1, CardClass.ARCHER, "Cablooey shoots the opposing unit for half of its current HP."),
-    Catapulty("Catapulty", "Swing and a... heh, I never miss.", 3, 3, 5, CardClass.ARCHER, "Catapulty returns the favor by shooting the opposing unit for its own attack value."),
-    Nomnom("Nomnom", "FREE FOOD?!", 3, 1, 3, CardClass.MAGE, "Nomnom's unceasing hunger grants the unit to his left life steal for the duration of the turn. Life steal heals the unit for the amount of damage it deals."),
-    TimeLord("Time Lord", "Time's running out, fella. [smirk]", 3, 4, 3, CardClass.MAGE, "Time Lord warps time and space to destroy the opposing unit if both him and the opposing unit are alive by the next turn. Time's up!"),
-    BigShot("Big Shot", "Now's your chance to be a [[BIG SHOT]]!", 4, 10, 1, CardClass.ARCHER, "Big Shot shoots the [[OPPOSING UNIT]] for the combined attack of all [[FRIENDLY UNITS]] on the board. [[DELICIOUS]]"),
-    IceCube("Ice Cube", "Get iced, dummy.", 4, 3, 1, CardClass.MAGE, "The opposing unit cannot attack or use its effect for the next turn. No more Mr. Nice Cube."),
-    Cheerleader("Cheerleader", "\"Her love, the type that makes you dedicate your life.\" ~ Unknown Musician", 4, 5, 5, CardClass.MAGE, "Cheerleader gives all friendly units on the board +3 attack and +3 HP for the duration of the turn. Go team!"),
-    HungryAssassin("Hungry Assassin", "You look... delicious.", 4, 10, 10, CardClass.RARE, "Hungry Assassin sacrifices as much HP as the opposing unit's HP to destroy it. Bon appétit!"),
-    Flea("Flea", "Life is too short to learn German.", 4, 1, 1, CardClass.RARE, "If Flea attacks another unit, destroy it after battle. Auf Wiedersehen!"),
-    BigGunga("Big Gunga", "A sophisticated gentleman such as myself is not to be trifled with.", 5, 15, 10, CardClass.BRAWLER, "Big Gunga attacks the opposing unit. If the opposing unit dies from this attack, Big Gunga gains half its stats. Call it a gentleman's quarrel."),
-    Sender("Sender", "I send you my regards.", 5, 4, 4, CardClass.ARCHER, "Sender, the divine messenger, shoots the opposing unit for the combined attack and HP values of the unit to his left. Aaaaand send!"),
-    RoyalSummoner("Royal Summoner", "I summon thee!", 5, 6, 7, CardClass.MAGE, "Summon a random unit from the discard pile, deck, or hand, and place it to the right of this unit. The Royal Summoner beckons thee."),
-    Copycat("Copycat", "I am thou, thou art I.", 5, 2, 2, CardClass.RARE, "For every unit on the board, gain 1 HP and 1 Attack for the duration of the turn. The Copycat is you, and you are the Copycat."),
-    UnceasingVoid("The Unceasing Void", "Infinity.", 5, 30, 0, CardClass.RARE, "While The Unceasing Void is on the board, you cannot die. Infinity is a long time.")
-]
\ No newline at end of file
+cards_list = load_catalog()
+
+
+class CatalogIndex:
+    """The card catalog bucketed by rarity and sorted by tier, built once for cheap random draws over a tier range.
+
+    Each bucket keeps a cumulative table per tier, so the cards between two tiers are a contiguous slice of the bucket.
+    With uniform weights a draw is a single randrange over that slice, and with weights it is a bisect over the
+    cumulative weights. Either way, no list is built per draw.
+    """
+
+    RARE_CHANCE = 0.05  # Chance of drawing a rare card instead, once the highest tier is above 3
+
+    def __init__(self, cards: list, weights: Optional[list] = None):
+        self.max_tier = max(card.tier for card in cards)
+        self.weighted = weights is not None
+        if weights is None:
+            weights = [1] * len(cards)
+        rare = [(card, weight) for card, weight in zip(cards, weights) if card.card_class == CardClass.RARE]
+        common = [(card, weight) for card, weight in zip(cards, weights) if card.card_class != CardClass.RARE]
+        self.rare, self.rare_ends, self.rare_weights = self._build_bucket(rare)
+        self.common, self.common_ends, self.common_weights = self._build_bucket(common)
+
+    def _build_bucket(self, entries: list):
+        """Return the bucket's cards sorted by tier, the end of each tier's slice, and the cumulative weights."""
+        entries.sort(key=lambda entry: entry[0].tier)  # Stable, so cards keep their catalog order within a tier
+        cards = tuple(card for card, weight in entries)
+        # ends[tier] is the number of cards with that tier or lower
+        ends = [0] * (self.max_tier + 1)
+        for card in cards:
+            for tier in range(card.tier, self.max_tier + 1):
+                ends[tier] += 1
+        cumulative_weights = list(accumulate(weight for card, weight in entries))
+        return cards, ends, cumulative_weights
+
+    def _pick(self, cards: tuple, ends: list, cumulative_weights: list, lowest_tier: int, highest_tier: int, rng):
+        start, stop = ends[lowest_tier - 1], ends[highest_tier]
+        if start >= stop:
+            raise IndexError(f"No cards between tiers {lowest_tier} and {highest_tier}.")
+        if not self.weighted:
+            return cards[rng.randrange(start, stop)]
+        low = cumulative_weights[start - 1] if start else 0
+        point = low + rng.random() * (cumulative_weights[stop - 1] - low)
+        return cards[min(bisect_right(cumulative_weights, point, start, stop), stop - 1)]
+
+    def draw(self, lowest_tier: int, highest_tier: int, rng=random):
+        """Return a random card between the given tiers, or a rare card of at most the highest tier 5% of the time."""
+        if lowest_tier < 1:
+            lowest_tier = 1
+        if highest_tier < 1:
+            highest_tier = 1
+        highest_tier = min(highest_tier, self.max_tier)
+        lowest_tier = min(lowest_tier, self.max_tier + 1)
+        if rng.random() < self.RARE_CHANCE and highest_tier > 3:
+            return self._pick(self.rare, self.rare_ends, self.rare_weights, 1, highest_tier, rng)
+        return self._pick(self.common, self.common_ends, self.common_weights, lowest_tier, highest_tier, rng)
+
+
+catalog_index = CatalogIndex(cards_list)
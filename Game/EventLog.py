@@ -0,0 +1,116 @@
+"""Structured event logging for the game engine.
+
+Events are only built when their level is enabled. Hot paths guard every event with a plain attribute check:
+
+    if log.debug_enabled:
+        log.debug("Pew", "Deal 2 damage to the unit in front of it", target=target.name)
+
+so a disabled event costs a single attribute lookup, with no f-string formatting and no Deck.__str__. Enabled events
+are appended to a buffered sink as (level, source, message, fields) records and only written out when the sink
+flushes, instead of going to stdout one print at a time.
+"""
+import atexit
+import sys
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+level_names = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+
+def format_record(record):
+    """Return a record as a single line of text."""
+    level, source, message, fields = record
+    line = f"{level_names.get(level, level)} {source}: {message}"
+    if fields:
+        line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+    return line
+
+
+class BufferedSink:
+    """Collects records and writes them to a stream in batches."""
+
+    def __init__(self, stream=None, capacity: int = 4096):
+        self.stream = stream  # None means whatever sys.stdout is at flush time
+        self.capacity = capacity
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+        if len(self.records) >= self.capacity:
+            self.flush()
+
+    def flush(self):
+        if not self.records:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("\n".join(format_record(record) for record in self.records) + "\n")
+        stream.flush()
+        self.records.clear()
+
+
+class MemorySink:
+    """Keeps the records in memory, for tools that want to inspect the events of a match."""
+
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+    def flush(self):
+        pass
+
+
+class EventLog:
+    """Level-filtered structured events.
+
+    Attributes:
+        level (int): Events below this level are dropped.
+        debug_enabled (bool): Whether DEBUG events are enabled. Check this before building a DEBUG event.
+        info_enabled (bool): Whether INFO events are enabled. Check this before building an INFO event.
+        sink: Where enabled events are written. Anything with write(record) and flush() methods.
+    """
+
+    def __init__(self, level: int = WARNING, sink=None):
+        self.sink = sink if sink is not None else BufferedSink()
+        self.set_level(level)
+
+    def set_level(self, level: int):
+        """Set the lowest level of events that are kept."""
+        self.level = level
+        self.debug_enabled = level <= DEBUG
+        self.info_enabled = level <= INFO
+
+    def set_sink(self, sink):
+        """Flush the current sink and send the following events to the given one."""
+        self.sink.flush()
+        self.sink = sink
+
+    def emit(self, level: int, source: str, message: str, **fields):
+        """Record an event if its level is enabled."""
+        if level >= self.level:
+            self.sink.write((level, source, message, fields))
+
+    def debug(self, source: str, message: str, **fields):
+        self.emit(DEBUG, source, message, **fields)
+
+    def info(self, source: str, message: str, **fields):
+        self.emit(INFO, source, message, **fields)
+
+    def warning(self, source: str, message: str, **fields):
+        self.emit(WARNING, source, message, **fields)
+
+    def error(self, source: str, message: str, **fields):
+        self.emit(ERROR, source, message, **fields)
+
+    def flush(self):
+        self.sink.flush()
+
+
+# The log shared by the whole engine. Only warnings and errors are kept unless a debug session lowers the level.
+log = EventLog()
+atexit.register(log.flush)
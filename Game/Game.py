@@ -1,4 +1,109 @@
-import os
+"""Entry point of the game: shows the login window straight away and loads the game behind it.
+
+Only Qt and the Login window are imported before the login window is painted. The game itself (GameUI, and through it
+the rules engine and the card catalog) is imported on a background thread once the window is up, and the card images
+are decoded and scaled on the asset pool (see Assets), so by the time the player has typed their password there is
+nothing left to load.
+
+Usage (from the Game directory):
+    python Game.py
+    python Game.py --startup-timing  # Log straight in, print how long the login window and first board took and quit
+"""
+import time
+
+_started = time.perf_counter()  # Before Qt is imported, which is most of the time to the login window
+
+import argparse
+import sys
+
+from PySide6.QtCore import QEvent, QObject, QThread, QTimer
+from PySide6.QtWidgets import QApplication
+
+from Login import Login
+
+
+class WarmUp(QThread):
+    """Imports the game and has its images scaled to the sizes they are drawn at, so logging in only builds the window."""
+
+    def __init__(self, pixel_ratio: float):
+        super().__init__()
+        self.pixel_ratio = pixel_ratio
+
+    def run(self):
+        # Deferred, as loading these is what the thread is for. Login imports GameUI again when it is needed
+        from Assets import assets
+        from Card import cards_list
+        from GameUI import FIELD_BACKGROUND, prepare_images
+        prepare_images([card.name for card in cards_list], self.pixel_ratio, FIELD_BACKGROUND)
+        assets.wait()
+
+
+class FirstPaint(QObject):
+    """Calls back once, after the first time the watched widget is painted."""
+
+    def __init__(self, widget, callback):
+        super().__init__(widget)
+        self.callback = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            watched.removeEventFilter(self)
+            # Called once control is back in the event loop, so the paint itself is finished
+            QTimer.singleShot(0, self.callback)
+        return False
+
+
+class StartupTiming:
+    """Logs straight in once the game has loaded and prints the milestones of the startup."""
+
+    def __init__(self, app, login, warm_up):
+        self.app = app
+        self.login = login
+        self.marks = []  # (milestone, milliseconds since the launcher started)
+        self.logged_in = None
+        FirstPaint(login, self.login_painted)
+        warm_up.finished.connect(self.warmed_up)
+
+    def mark(self, milestone: str):
+        elapsed = (time.perf_counter() - _started) * 1000
+        self.marks.append((milestone, elapsed))
+        return elapsed
+
+    def login_painted(self):
+        self.mark('login window')
+
+    def warmed_up(self):
+        # As if the player logged in the moment the game was ready
+        self.logged_in = self.mark('game loaded')
+        self.login.launch_game(None)
+        FirstPaint(self.login.game_ui, self.board_painted)
+
+    def board_painted(self):
+        self.mark('first board')
+        for milestone, elapsed in self.marks:
+            print(f"{milestone:<14}{elapsed:8.1f} ms")
+        print(f"{'login to board':<14}{self.marks[-1][1] - self.logged_in:8.1f} ms")
+        self.app.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play CardMaster.")
+    parser.add_argument('--startup-timing', action='store_true',
+                        help="log straight in once the game has loaded, print the startup times and quit")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    login = Login()
+    warm_up = WarmUp(app.devicePixelRatio())
+    # Waited for on the way out, as Qt aborts if a thread it still runs is destroyed
+    app.aboutToQuit.connect(warm_up.wait)
+    # Kept in a variable for as long as the app runs, as Qt only holds weak references to its callbacks
+    timing = StartupTiming(app, login, warm_up) if args.startup_timing else None
+    FirstPaint(login, warm_up.start)
+    login.show()
+    sys.exit(app.exec())
+
 
 if __name__ == '__main__':
-    os.system('python Login.py')
+    main()
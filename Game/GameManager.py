@@ -1,9 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from Card import IdAllocator
 from User import Player, Enemy
 from Match import Match
+from Seeding import new_seed, spawn_rng
+from Strategy import DEFAULT_STRATEGY, release_strategy
+
+_prefetcher = None  # Thread building upcoming matches, see GameManager.prefetch_next_match. Started on first use
 
 class GameManager:
-    def __init__(self, debug_mode=False):
+    def __init__(self, debug_mode=False, seed=None, replay=None, enemy_strategy=DEFAULT_STRATEGY,
+                 speculate_enemy=False, prefetch_next_match=False, prefetch_images=False):
         self.debug_mode = debug_mode
+        # Every random choice of the run comes from streams derived from this seed, so the run can be reproduced
+        self.seed = seed if seed is not None else new_seed()
+        self.replay = replay  # ReplayLog recording the run, if any
+        self.enemy_strategy = enemy_strategy  # How the enemies pick their cards, such as 'mcts' for a hard opponent
+        self.speculate_enemy = speculate_enemy  # Whether enemies work their turns out during PLAY, see Match
+        # Whether the next match is built on a background thread while the current one is played, so that moving on
+        # to it takes no time, and whether its card images are decoded there too (only for a UI, as that needs Qt)
+        self.prefetch_next_match = prefetch_next_match
+        self.prefetch_images = prefetch_images
+        self._prefetched = None  # ((match number, tier), future) of the match being built in the background
         self.game_over = False
         self.current_match_number = 0
         self.tier = 1
@@ -27,22 +45,77 @@ class GameManager:
         """Start a new match."""
         self.current_match_number += 1
         # Increase the tier every 2 matches
-        if self.current_match_number % 2 == 0:
-            self.tier += 1
-            if self.tier > 5:
-                self.tier = 5
+        self.tier = self.next_tier(self.current_match_number, self.tier)
+        match = self._take_prefetched(self.current_match_number, self.tier)
+        if match is None:
+            match = self.build_match(self.current_match_number, self.tier)
+        if self.current_match is not None:
+            self.release_strategies()  # The match being replaced may not be over
+        self.player = match.player
+        self.current_match = match
+        self.current_match.start()
+        if self.prefetch_next_match:
+            self._prefetch(self.current_match_number + 1, self.next_tier(self.current_match_number + 1, self.tier))
+
+    @staticmethod
+    def next_tier(match_number: int, tier: int):
+        """Return the tier of the given match, from the tier of the match before it."""
+        if match_number % 2 == 0:
+            return min(tier + 1, 5)
+        return tier
+
+    def build_match(self, match_number: int, tier: int):
+        """Return a new match with its users and their decks, not started yet.
+
+        Everything comes from the run's seed and the match number, so it can be built before the match is reached.
+        """
         # Make a new enemy for each round
-        deck_size = self.current_match_number * 2 + 10
+        deck_size = match_number * 2 + 10
+        # Each user of each match gets its own stream, independent of how many draws happened before it
+        player_rng = spawn_rng(self.seed, match_number, 'player')
+        enemy_rng = spawn_rng(self.seed, match_number, 'enemy')
+        ids = IdAllocator()  # Card ids are numbered from 1 in every match
         if self.debug_mode:
-            self.player = Player(self.current_match_number, self.tier, 'Player', deck_size, 'debug')
+            player = Player(match_number, tier, 'Player', deck_size, 'debug', player_rng, ids)
         else:
-            self.player = Player(self.current_match_number, self.tier, 'Player', deck_size, 'player')
+            player = Player(match_number, tier, 'Player', deck_size, 'player', player_rng, ids)
         enemy = None
         if self.debug_mode:
-            enemy = Enemy(self.current_match_number, self.tier, deck_size, 'Enemy', 'debug')
+            enemy = Enemy(match_number, tier, deck_size, 'Enemy', 'debug', enemy_rng, ids)
         else:
-            enemy = Enemy(self.current_match_number, self.tier, deck_size, 'Enemy', 'enemy')
-        self.current_match = Match(self.tier, self.player, enemy)
+            enemy = Enemy(match_number, tier, deck_size, 'Enemy', 'enemy', enemy_rng, ids)
+        enemy.strategy = self.enemy_strategy
+        return Match(tier, player, enemy, match_number, self.replay, self.speculate_enemy)
+
+    def _prefetch(self, match_number: int, tier: int):
+        """Build the match after this one on a background thread, in case the player wins this one."""
+        global _prefetcher
+        if _prefetcher is None:
+            _prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self._prefetched = ((match_number, tier), _prefetcher.submit(self._build_and_warm, match_number, tier))
+
+    def _build_and_warm(self, match_number: int, tier: int):
+        match = self.build_match(match_number, tier)
+        if self.prefetch_images:
+            # Decoding the card images is the slow part of showing a new match, so it is done here too
+            names = set()
+            for user in (match.player, match.enemy):
+                for card in user.alive_deck:
+                    if card.name not in names:
+                        names.add(card.name)
+                        card.image
+        return match
+
+    def _take_prefetched(self, match_number: int, tier: int):
+        """Return the prefetched match if it is the one wanted, or None."""
+        if self._prefetched is None:
+            return None
+        key, future = self._prefetched
+        self._prefetched = None
+        if key != (match_number, tier):
+            future.cancel()
+            return None
+        return future.result()  # Waits for it if it is still being built
 
     def check_match(self):
         """Check if the match is over."""
@@ -52,14 +125,22 @@ class GameManager:
         else:
             return False
 
+    def release_strategies(self):
+        """Let the strategies of both users of the current match forget what they kept for it."""
+        release_strategy(self.current_match.player)
+        release_strategy(self.current_match.enemy)
+
     def end_match(self):
         """End the current match."""
+        self.release_strategies()
         if self.current_match.winner == self.player:
             self.record_win()
             self.start_match()
         else:
             self.record_loss()
             self.game_over = True
+            if self.replay is not None:
+                self.replay.end_run()
 
     def get_game_stats(self):
         """Return a string of the current game statistics."""
@@ -1,26 +1,50 @@
 import sys
 import copy
-import uuid
+from collections import OrderedDict
 
 from PySide6.QtWidgets import QApplication, QWidget, QLabel, QToolTip, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, \
     QComboBox, QGroupBox
-from PySide6.QtCore import QTimer, Qt, QRect, QPoint
-from PySide6.QtGui import QPainter, QColor, QFont, QPixmap, QPalette, QTextOption, QFontMetrics
+from PySide6.QtCore import QTimer, Qt, QRect, QRectF, QPoint, Signal
+from PySide6.QtGui import QPainter, QColor, QFont, QPixmap, QPalette, QFontMetrics
+from Assets import assets
+from EventLog import DEBUG, log
 from GameManager import GameManager
 
+CARD_FACE_CACHE_SIZE = 256  # Rendered card faces kept around; a full board, both hands and their animations fit easily
+CARD_SIZE_STEP = 4  # Card faces are rendered at sizes rounded to this many pixels, so an animation reuses a few faces
+SMALL_CARD_SIZE = (100, 150)  # Width and height of a card at rest
+LARGE_CARD_SIZE = (140, 210)  # And of a card under the mouse
+WINDOW_SIZE = (1600, 900)  # Size the window opens at
+FIELD_BACKGROUND = 'field bg'
+FRAME_INTERVAL = 1000 // 120  # Roughly 120 fps while something is animating
+SIZE_EPSILON = 0.5  # A card this close to its target size has finished animating and snaps to it
+STEP_INTERVAL = 80  # Milliseconds each effect and attack stays on screen before the next one resolves
+
 
 class GameUI(QWidget):
+    # Emitted from the asset pool when an image that was not ready while painting is, see Assets
+    assets_ready = Signal()
+
     def __init__(self, debug_mode=False):
         super().__init__()
         self.debug_mode = debug_mode
+        self.assets_ready.connect(self.on_assets_ready)
+        if debug_mode:
+            log.set_level(DEBUG)
 
+        # The enemy works its turn out while the player is still picking cards, and the next match with its card images
+        # is made ready while this one is played
         if debug_mode:
-            self.game_manager = GameManager(debug_mode=True)
+            self.game_manager = GameManager(debug_mode=True, speculate_enemy=True, prefetch_next_match=True,
+                                            prefetch_images=True)
         else:
-            self.game_manager = GameManager()
+            self.game_manager = GameManager(speculate_enemy=True, prefetch_next_match=True, prefetch_images=True)
 
         self.game_over = False
         self.animation_states = {}
+        self.card_faces = CardFaceCache(CARD_FACE_CACHE_SIZE, notify=self.assets_ready.emit)
+        self.background = FIELD_BACKGROUND
+        self._background_key = None  # Asset and size of the background put up last
         self.initUI()
 
         self.card_rects = {}  # To store rectangles of cards currently displayed
@@ -35,9 +59,14 @@ class GameUI(QWidget):
         self.play_cards_button.clicked.connect(self.play_cards)
         self.continue_button.clicked.connect(self.continue_turn)
 
+        # Phases are resolved a step at a time from this timer, so the window keeps painting in between
+        self.phase_steps = None
+        self.step_timer = QTimer(self)
+        self.step_timer.timeout.connect(self.resolve_step)
+
     def print_debug(self, message):
-        if self.debug_mode:
-            print(message)
+        if self.debug_mode and log.debug_enabled:
+            log.debug("GameUI", message)
 
     def hide_tooltip(self):
         if not any(self.animation_states[i]['tooltip_shown'] for i in self.animation_states):
@@ -53,28 +82,47 @@ class GameUI(QWidget):
         # Update the background image to fit the new size
         self.applyBackground()
 
-    def applyBackground(self):
-        # Scale pixmap to current size and set as background
-        scaled_pixmap = self.bg_pixmap.scaled(self.size(), Qt.KeepAspectRatioByExpanding)
+    def applyBackground(self, wait=False):
+        # The background is scaled to the current size on the asset pool, and put up once it is ready
+        pixel_ratio = self.devicePixelRatioF()
+        key = (self.background, round(self.width() * pixel_ratio), round(self.height() * pixel_ratio))
+        if key == self._background_key:
+            return
+        if wait or self._background_key is None:
+            # The first frame should not go without a background
+            image = assets.scaled(*key, Qt.KeepAspectRatioByExpanding)
+        else:
+            image = assets.request(*key, Qt.KeepAspectRatioByExpanding, notify=self.assets_ready.emit)
+            if image is None:
+                return  # Put up by on_assets_ready instead
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(pixel_ratio)
         palette = QPalette()
-        palette.setBrush(QPalette.Window, scaled_pixmap)
+        palette.setBrush(QPalette.Window, pixmap)
         self.setPalette(palette)
+        self._background_key = key
+
+    def on_assets_ready(self):
+        # Paint again with the image that is now ready, which may be the background for the current size
+        self.applyBackground()
+        self.update()
 
     def initUI(self):
-        self.setGeometry(300, 300, 1600, 900)
+        self.setGeometry(300, 300, *WINDOW_SIZE)
         self.setWindowTitle('CardMaster')
 
-        # Load and set background image
-        self.bg_pixmap = QPixmap('img/field bg.png')
+        # Set background image
         self.applyBackground()
 
         # Font setup
         self.font = QFont('Arial', 16)
 
-        # Timer for animation
+        # Timer for animation. It only runs while a card is animating and sleeps otherwise, see request_frames
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update)
-        self.timer.start(1000 // 120)  # roughly 120 fps
+        self.timer.setInterval(FRAME_INTERVAL)
+        self.timer.timeout.connect(self.animation_tick)
+        self.animating = False  # Set by paintEvent when a card has not reached its target size yet
+        self.setMouseTracking(True)  # Hovering grows cards, so mouse moves have to reach us without a button held
 
         # Animation state initialization
         self.init_animation_states()
@@ -143,24 +191,35 @@ class GameUI(QWidget):
         # For player's cards
         for card in self.game_manager.player.hand.cards:
             self.animation_states[card.uuid] = self.create_card_animation_state(True)
-            self.print_debug(f"DEBUG: Player card UUID: {card.uuid}")
+            self.print_debug(f"Player card UUID: {card.uuid}")
         # For enemy's cards
         for card in self.game_manager.current_match.enemy.hand.cards:
             self.animation_states[card.uuid] = self.create_card_animation_state(False)
-            self.print_debug(f"DEBUG: Enemy card UUID: {card.uuid}")
+            self.print_debug(f"Enemy card UUID: {card.uuid}")
 
         for card in self.game_manager.player.cards_on_board.cards:
             self.animation_states[card.uuid] = self.create_card_animation_state(True)
-            self.print_debug(f"DEBUG: Player card on board UUID: {card.uuid}")
+            self.print_debug(f"Player card on board UUID: {card.uuid}")
 
         for card in self.game_manager.current_match.enemy.cards_on_board.cards:
             self.animation_states[card.uuid] = self.create_card_animation_state(False)
-            self.print_debug(f"DEBUG: Enemy card on board UUID: {card.uuid}")
+            self.print_debug(f"Enemy card on board UUID: {card.uuid}")
+        self.prepare_card_images()
+
+    def prepare_card_images(self):
+        """Have the image of every card of the match scaled to every size it is drawn at, on the asset pool."""
+        match = self.game_manager.current_match
+        names = set()
+        for user in (match.player, match.enemy):
+            for deck in (user.hand, user.cards_on_board, user.alive_deck):
+                for card in deck:
+                    names.add(card.name)
+        prepare_images(names, self.devicePixelRatioF())
 
     def create_card_animation_state(self, is_player_card):
         return {
-            'width': 100, 'height': 150,
-            'target_width': 100, 'target_height': 150,
+            'width': SMALL_CARD_SIZE[0], 'height': SMALL_CARD_SIZE[1],
+            'target_width': SMALL_CARD_SIZE[0], 'target_height': SMALL_CARD_SIZE[1],
             'small': True,
             'tooltip_shown': False,
             'clicked': False,
@@ -171,55 +230,93 @@ class GameUI(QWidget):
     def update_stats(self):
         self.enemy_stats_label.setText(f"Enemy\nHP: {self.game_manager.current_match.enemy.hp}\nMana: {self.game_manager.current_match.enemy.mana}")
         self.player_stats_label.setText(f"Player\nHP: {self.game_manager.current_match.player.hp}\nMana: {self.game_manager.current_match.player.mana}")
-        if self.game_manager.game_over:
+        if self.game_manager.game_over and not self.game_over:
             self.game_over_screen()
 
     def interpolate(self, value, target, speed):
         return value + (target - value) * speed
 
+    def request_frames(self):
+        """Repaint, and keep repainting every frame for as long as a card is animating."""
+        if not self.game_over and not self.timer.isActive():
+            self.timer.start()
+        self.update()
+
+    def animation_tick(self):
+        window = self.windowHandle()
+        if self.game_over or not self.isVisible() or (window is not None and not window.isExposed()):
+            # Nobody can see the animation. The next paint, once the window is exposed again, restarts the timer
+            self.timer.stop()
+            return
+        self.update()
+
+    def mouseMoveEvent(self, event):
+        # Only repaint when the mouse is over a card, or has just left the card it was over
+        if self.current_hover_uuid is not None or any(
+                'x' in state and abs(event.pos().x() - state['x']) <= state['width'] / 2
+                and abs(event.pos().y() - state['y']) <= state['height'] / 2
+                for state in self.animation_states.values()):
+            self.request_frames()
+
+    def leaveEvent(self, event):
+        self.request_frames()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+
     def paintEvent(self, event):
         painter = QPainter(self)
+        self.animating = False
+        # The match that just ended is dealt with here, and the window goes on to paint the next one or the game over
+        # screen in the same paint rather than asking for another
+        if not self.game_over and self.game_manager.check_match():
+            if not self.game_manager.game_over:
+                self.init_animation_states()  # Card ids start over in every match
+            self.update_stats()
         if self.game_over:
             painter.setFont(QFont('Arial', 48))
             if self.game_manager.current_match.winner is None:
                 painter.drawText(self.rect(), Qt.AlignCenter, f"Game Over!\nIt's a draw!\nWins: {self.game_manager.player_wins}")
             else:
                 painter.drawText(self.rect(), Qt.AlignCenter, f"Game Over!\n{self.game_manager.current_match.winner.name} wins!\nWins: {self.game_manager.player_wins}")
-        if self.game_manager.check_match():
-            self.update_stats()
-            self.update()
+            return
+        # Normal game drawing happens here
+        self.draw_deck(painter, self.game_manager.current_match.player.hand, self.width() // 8, self.height() * 3 // 4 + 50)
+        self.draw_deck(painter, self.game_manager.current_match.enemy.hand, self.width() // 8,
+                       self.height() // 4 - 50)
+        self.draw_deck(painter, self.game_manager.current_match.player.cards_on_board, self.width() // 8, self.height() // 2 + 75,
+                       "board")
+        self.draw_deck(painter, self.game_manager.current_match.enemy.cards_on_board, self.width() // 8,
+                       self.height() // 2 - 80, "board")
+        self.update_stats()
+        if self.animating:
+            self.request_frames()
         else:
-            # Normal game drawing happens here
-            self.draw_deck(painter, self.game_manager.current_match.player.hand, self.width() // 8, self.height() * 3 // 4 + 50)
-            self.draw_deck(painter, self.game_manager.current_match.enemy.hand, self.width() // 8,
-                           self.height() // 4 - 50)
-            self.draw_deck(painter, self.game_manager.current_match.player.cards_on_board, self.width() // 8, self.height() // 2 + 75,
-                           "board")
-            self.draw_deck(painter, self.game_manager.current_match.enemy.cards_on_board, self.width() // 8,
-                           self.height() // 2 - 80, "board")
-            self.update_stats()
+            self.timer.stop()
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             clicked_uuid = None
             for uuid, state in self.animation_states.items():
-                self.print_debug(f"DEBUG: Checking card {uuid}")
+                if self.debug_mode:
+                    self.print_debug(f"Checking card {uuid}")
                 card_rect = QRect(state['x'] - state['width'] // 2, state['y'] - state['height'] // 2, state['width'],
                                   state['height'])
                 if card_rect.contains(event.pos()) and state['player_card'] and not state['is_on_board']:
                     state['clicked'] = not state['clicked']
                     clicked_uuid = uuid
                     break
-            if clicked_uuid:
+            if clicked_uuid is not None:
                 self.handle_card_click(clicked_uuid)
             self.update_play_cards_button()
+            self.update()
 
     def handle_card_click(self, card_uuid):
         card = self.get_card_by_uuid(card_uuid)
         if self.animation_states[card_uuid]['clicked']:
-            self.print_debug(f"DEBUG handle_card_click: Card {card.name} is clicked!")
+            self.print_debug(f"handle_card_click: Card {card.name} is clicked!")
         else:
-            self.print_debug(f"DEBUG handle_card_click: Card {card.name} is unclicked!")
+            self.print_debug(f"handle_card_click: Card {card.name} is unclicked!")
 
     def reset_card_states(self):
         for state in self.animation_states.values():
@@ -227,18 +324,7 @@ class GameUI(QWidget):
         self.update_play_cards_button()  # Update the button states
 
     def get_card_by_uuid(self, card_uuid):
-        all_cards = (self.game_manager.current_match.player.hand.cards +
-                     self.game_manager.current_match.enemy.hand.cards +
-                     self.game_manager.current_match.player.cards_on_board.cards +
-                     self.game_manager.current_match.enemy.cards_on_board.cards +
-                     self.game_manager.current_match.player.dead_deck.cards +
-                     self.game_manager.current_match.enemy.dead_deck.cards +
-                     self.game_manager.current_match.player.alive_deck.cards +
-                     self.game_manager.current_match.enemy.alive_deck.cards)
-        for card in all_cards:
-            if card.uuid == card_uuid:
-                return card
-        return None
+        return self.game_manager.current_match.registry.get(card_uuid)
 
     def update_play_cards_button(self):
         any_card_clicked = any(
@@ -248,13 +334,32 @@ class GameUI(QWidget):
     def continue_turn(self):
         # Submit the cards on the board and go to the effects phase of the battle
         self.print_debug(f"Phase: {self.game_manager.current_match.phase.name}")
-        self.game_manager.current_match.cycle_phase()
+        if self.phase_steps is not None:
+            return  # Still resolving the previous phase
+        self.phase_steps = self.game_manager.current_match.advance()
+        self.continue_button.setEnabled(False)
+        self.step_timer.start(0)
+
+    def resolve_step(self):
+        step = next(self.phase_steps, None)
+        if step is None:
+            self.step_timer.stop()
+            self.phase_steps = None
+            self.continue_button.setEnabled(True)
+            self.finish_phase()
+        else:
+            # Leave each effect and attack on screen for a moment, but go straight through phase changes
+            self.step_timer.setInterval(0 if step.kind == 'phase' else STEP_INTERVAL)
+        self.update()
+
+    def finish_phase(self):
         for uuid, state in self.animation_states.items():
             if state['clicked'] and state['player_card']:
                 card = self.get_card_by_uuid(uuid)
-                if card in self.game_manager.current_match.player.cards_on_board.cards:
+                if card in self.game_manager.current_match.player.cards_on_board:
                     state['is_on_board'] = True
         self.reset_card_states()
+        log.flush()
 
     def play_cards(self):
         for uuid, state in self.animation_states.items():
@@ -263,6 +368,7 @@ class GameUI(QWidget):
                 if self.game_manager.current_match.player.play_card(card):
                     state['is_on_board'] = True
         self.reset_card_states()
+        self.update()
 
     def open_debug_window(self):
         if self.debug_mode:  # Ensure it opens only in debug mode
@@ -304,7 +410,8 @@ class GameUI(QWidget):
         # Ensure that there is an animation state for every card drawn
         if uuid not in animation_states:
             animation_states[uuid] = self.create_card_animation_state(card)
-            print(f"Created animation state for new card with UUID: {uuid}")
+            if log.debug_enabled:
+                log.debug("GameUI", "Created animation state for new card", uuid=uuid)
         state = animation_states[card.uuid]
         mouse_pos = self.mapFromGlobal(self.cursor().pos())
         card_rect = QRect(x - state['width'] // 2, y - state['height'] // 2, state['width'], state['height'])
@@ -319,17 +426,136 @@ class GameUI(QWidget):
             state['small'] = True
 
         if state['small']:
-            state['target_width'] = 100
-            state['target_height'] = 150
+            state['target_width'], state['target_height'] = SMALL_CARD_SIZE
         elif not state['small']:
-            state['target_width'] = 140
-            state['target_height'] = 210
+            state['target_width'], state['target_height'] = LARGE_CARD_SIZE
 
         # Smooth transition of card size
         state['width'] = self.interpolate(state['width'], state['target_width'], 0.1)
         state['height'] = self.interpolate(state['height'], state['target_height'], 0.1)
+        if abs(state['width'] - state['target_width']) < SIZE_EPSILON and \
+                abs(state['height'] - state['target_height']) < SIZE_EPSILON:
+            state['width'] = state['target_width']
+            state['height'] = state['target_height']
+        else:
+            self.animating = True
         card_rect = QRect(x - state['width'] // 2, y - state['height'] // 2, state['width'], state['height'])
 
+        # Blit the pre-rendered face of the card instead of laying it out again every frame
+        face = self.card_faces.get(card, state['width'], state['height'], state['small'], state['clicked'],
+                                   self.devicePixelRatioF())
+        painter.drawPixmap(card_rect.topLeft(), face)
+
+        if card_rect.contains(mouse_pos):
+            if self.current_hover_uuid != uuid:  # New card hovered
+                if self.current_hover_uuid is not None:  # There was a previous card being hovered
+                    self.animation_states[self.current_hover_uuid]['tooltip_shown'] = False
+                self.current_hover_uuid = uuid
+                self.tooltip.setText(f"{card.description}\n\nType: {card.card_class.name}\n\nEffect: {card.effect_description}")
+                tooltip_pos = self.mapToGlobal(card_rect.bottomRight() + QPoint(20, -40))
+                self.tooltip.move(tooltip_pos)
+                self.tooltip.adjustSize()
+                self.tooltip.show()
+                state['tooltip_shown'] = True
+                self.hover_timer.stop()  # Stop the timer as we are over a card
+        else:
+            if state['tooltip_shown']:
+                state['tooltip_shown'] = False  # Mark the tooltip as no longer shown for this card
+                if self.current_hover_uuid == uuid:  # Check if this is the last card hovered over
+                    self.hover_timer.start(100)  # Delay before hiding tooltip to check if another card is hovered
+
+    def game_over_screen(self):
+        self.game_over = True
+        # Clear UI elements
+        self.enemy_stats_label.hide()
+        self.player_stats_label.hide()
+        self.play_cards_button.hide()
+        self.continue_button.hide()
+        if self.debug_mode:
+            self.debug_button.hide()
+        # Set background to game over screen (actually repurposed title screen)
+        self.background = 'title screen'
+        self.applyBackground(wait=True)
+        self.timer.stop()  # Nothing animates on the game over screen
+
+
+def prepare_images(card_names, pixel_ratio: float, background=None):
+    """Have the images of the cards scaled to every size they are drawn at, on the asset pool.
+
+    The background, if any, is scaled to the size the window opens at.
+    """
+    if background is not None:
+        size = (round(WINDOW_SIZE[0] * pixel_ratio), round(WINDOW_SIZE[1] * pixel_ratio))
+        assets.prepare(background, [size], Qt.KeepAspectRatioByExpanding)
+    sizes = [(round(side * pixel_ratio), round(side * pixel_ratio)) for side in CardFaceCache.icon_sizes()]
+    for name in sorted(card_names):
+        assets.prepare(name, sizes)
+
+
+class CardFaceCache:
+    """Least recently used cache of pre-rendered card faces.
+
+    A face only depends on the card's prototype and stats and on how it is shown, so it is rendered once into a QPixmap
+    and blitted on every following frame. The card's image is drawn from Assets at the size it is drawn at, so a face
+    is never rendered with an image that still has to be scaled.
+    """
+
+    def __init__(self, capacity: int, notify=None):
+        self.capacity = capacity
+        self.faces = OrderedDict()
+        self.notify = notify  # Called from the asset pool once an image a face was rendered without is ready
+
+    @staticmethod
+    def snap(length: float):
+        return max(CARD_SIZE_STEP, round(length / CARD_SIZE_STEP) * CARD_SIZE_STEP)
+
+    @staticmethod
+    def icon_size(width: int, height: int):
+        return max(50, width // 2, height // 2)
+
+    @classmethod
+    def icon_sizes(cls):
+        """Every size the image of a card is drawn at, the sizes of cards at rest and under the mouse first."""
+        sizes = [cls.icon_size(cls.snap(width), cls.snap(height)) for width, height in (SMALL_CARD_SIZE, LARGE_CARD_SIZE)]
+        # A card growing or shrinking between the two goes through every size in between
+        for height in range(SMALL_CARD_SIZE[1], LARGE_CARD_SIZE[1] + 1):
+            width = height * SMALL_CARD_SIZE[0] / SMALL_CARD_SIZE[1]
+            size = cls.icon_size(cls.snap(width), cls.snap(height))
+            if size not in sizes:
+                sizes.append(size)
+        return sizes
+
+    def get(self, card, width: float, height: float, small: bool, clicked: bool, pixel_ratio: float = 1.0):
+        """Return the face of the card at the given size (rounded to CARD_SIZE_STEP) and state."""
+        width = self.snap(width)
+        height = self.snap(height)
+        key = (card.name, card.tier, card.hp, card.attack, width, height, small, clicked, pixel_ratio)
+        face = self.faces.get(key)
+        if face is not None:
+            self.faces.move_to_end(key)
+            return face
+        face, complete = self.render(card, width, height, small, clicked, pixel_ratio)
+        if complete:
+            # A face drawn with a stand-in for its image is rendered again once the image is ready
+            self.faces[key] = face
+            if len(self.faces) > self.capacity:
+                self.faces.popitem(last=False)
+        return face
+
+    def clear(self):
+        self.faces.clear()
+
+    def render(self, card, width: int, height: int, small: bool, clicked: bool, pixel_ratio: float):
+        """Return the face and whether it was drawn with the card's image at the right size."""
+        # One extra pixel each way for the outline, which QPainter draws just outside the rectangle
+        face = QPixmap(int((width + 1) * pixel_ratio), int((height + 1) * pixel_ratio))
+        face.setDevicePixelRatio(pixel_ratio)
+        face.fill(Qt.transparent)
+        painter = QPainter(face)
+        card_rect = QRect(0, 0, width, height)
+        x = width // 2
+        y = height // 2
+
         # Paint background of the card
         if card.color.name == "RED":
             card_color = QColor(247, 78, 59)
@@ -344,49 +570,47 @@ class GameUI(QWidget):
         else:
             card_color = QColor(200, 200, 200)
 
-        painter.fillRect(card_rect, card_color if state['small'] else card_color.darker(125))
+        painter.fillRect(card_rect, card_color if small else card_color.darker(125))
         painter.setPen(QColor(0, 0, 0))
         painter.drawRect(card_rect)
 
         # Set font size based on card size
-        font_size = max(10, int(state['height'] / 15))  # Adjust font size dynamically
+        font_size = max(10, int(height / 15))  # Adjust font size dynamically
         font = QFont('Arial', font_size)
         painter.setFont(font)
 
-        icon_size = max(50, state['width'] // 2, state['height'] // 2)
+        icon_size = self.icon_size(width, height)
         icon_rect = QRect(x - icon_size // 2, y - icon_size // 2, icon_size, icon_size)
-        if card.image and not card.image.isNull():
-            painter.drawImage(icon_rect, card.image)  # Directly draw the QImage
+        # Until the image is ready at this size, the closest size that is stands in for it
+        side = round(icon_size * pixel_ratio)
+        image = assets.request(card.name, side, side, notify=self.notify)
+        complete = image is not None
+        if image is None:
+            image = assets.nearest(card.name, side, side)
+        if image is not None and not image.isNull():
+            # Drawn at its own size, so nothing is scaled here
+            image_rect = QRectF(0, 0, image.width() / pixel_ratio, image.height() / pixel_ratio)
+            image_rect.moveCenter(QRectF(icon_rect).center())
+            painter.drawImage(image_rect, image)
         else:
             # Draw a simple rectangle in the place of the image
             painter.fillRect(icon_rect, QColor(100, 100, 100))
 
         # Draw tier, HP, and attack labels
-        tier_label = f"Tier: {card.tier}" if not state['small'] else f"{card.tier}"
-        hp_label = f"HP: {card.hp}" if not state['small'] else f"{card.hp}"
-        attack_label = f"Attack: {card.attack}" if not state['small'] else f"{card.attack}"
+        tier_label = f"Tier: {card.tier}" if not small else f"{card.tier}"
+        hp_label = f"HP: {card.hp}" if not small else f"{card.hp}"
+        attack_label = f"Attack: {card.attack}" if not small else f"{card.attack}"
 
         # Text positioning
         corner_offset = font_size // 2
-        painter.drawText(card_rect.adjusted(corner_offset, corner_offset, -corner_offset, -corner_offset),
-                         Qt.AlignTop | Qt.AlignRight, tier_label)
-        painter.drawText(card_rect.adjusted(corner_offset, corner_offset, -corner_offset, -corner_offset),
-                         Qt.AlignBottom | Qt.AlignLeft, hp_label)
-        painter.drawText(card_rect.adjusted(corner_offset, corner_offset, -corner_offset, -corner_offset),
-                         Qt.AlignBottom | Qt.AlignRight, attack_label)
+        label_rect = card_rect.adjusted(corner_offset, corner_offset, -corner_offset, -corner_offset)
+        painter.drawText(label_rect, Qt.AlignTop | Qt.AlignRight, tier_label)
+        painter.drawText(label_rect, Qt.AlignBottom | Qt.AlignLeft, hp_label)
+        painter.drawText(label_rect, Qt.AlignBottom | Qt.AlignRight, attack_label)
 
         # Draw name centered above the icon
         # Define the rectangle where the name will be drawn
-        name_rect = QRect(x - state['width'] // 2, icon_rect.top() - 25, state['width'],
-                          20)  # Adjust height as needed to fit potentially wrapped text
-
-        # Set text options to align center and wrap text
-        text_option = QTextOption()
-        text_option.setAlignment(Qt.AlignCenter | Qt.TextWordWrap)
-
-        # Set the font and calculate if text needs wrapping
-        font = QFont('Arial', font_size)  # You may adjust the font size based on space or other criteria
-        painter.setFont(font)
+        name_rect = QRect(0, icon_rect.top() - 25, width, 20)  # Adjust height as needed to fit potentially wrapped text
 
         # Measure text to see if it fits in the provided rectangle
         font_metrics = QFontMetrics(font)
@@ -404,7 +628,7 @@ class GameUI(QWidget):
         # Draw the name text with the adjusted settings
         painter.drawText(name_rect, Qt.TextWordWrap | Qt.AlignCenter, card.name)
 
-        if state['clicked']:
+        if clicked:
             # Draw a thick border around the card when clicked
             border_width = 4  # Adjust this value to control border thickness (number of outlines)
 
@@ -418,48 +642,9 @@ class GameUI(QWidget):
                 painter.setPen(pen_color)
                 painter.drawRect(adjusted_rect)
 
-        if not state['small']:
-            # Only draw detailed text for large cards
-            detail_text_margin = state['width'] * 0.1
-            detail_text_rect = QRect(card_rect.left() + detail_text_margin, icon_rect.bottom() + 20,
-                                     card_rect.width() - 2 * detail_text_margin,
-                                     state['height'] - icon_rect.bottom() - 20)
-
-            detail_font_size = max(8, int(detail_text_rect.height() / 12))
-            detail_font = QFont('Arial', detail_font_size)
-            painter.setFont(detail_font)
-
-        if card_rect.contains(mouse_pos):
-            if self.current_hover_uuid != uuid:  # New card hovered
-                if self.current_hover_uuid is not None:  # There was a previous card being hovered
-                    self.animation_states[self.current_hover_uuid]['tooltip_shown'] = False
-                self.current_hover_uuid = uuid
-                self.tooltip.setText(f"{card.description}\n\nType: {card.card_class.name}\n\nEffect: {card.effect_description}")
-                tooltip_pos = self.mapToGlobal(card_rect.bottomRight() + QPoint(20, -40))
-                self.tooltip.move(tooltip_pos)
-                self.tooltip.adjustSize()
-                self.tooltip.show()
-                state['tooltip_shown'] = True
-                self.hover_timer.stop()  # Stop the timer as we are over a card
-        else:
-            if state['tooltip_shown']:
-                state['tooltip_shown'] = False  # Mark the tooltip as no longer shown for this card
-                if self.current_hover_uuid == uuid:  # Check if this is the last card hovered over
-                    self.hover_timer.start(100)  # Delay before hiding tooltip to check if another card is hovered
+        painter.end()
+        return face, complete
 
-    def game_over_screen(self):
-        self.game_over = True
-        # Clear UI elements
-        self.enemy_stats_label.hide()
-        self.player_stats_label.hide()
-        self.play_cards_button.hide()
-        self.continue_button.hide()
-        if self.debug_mode:
-            self.debug_button.hide()
-        # Set background to game over screen (actually repurposed title screen)
-        self.bg_pixmap = QPixmap('img/title screen.png')
-        self.applyBackground()
-        self.update()  # Ensure the widget repaints after these changes
 
 class CustomTooltip(QWidget):
     def __init__(self, parent=None):
@@ -578,44 +763,50 @@ class DebugWindow(QWidget):
     def add_card_to_hand(self, target):
         card_index = self.card_selector.currentIndex()
         card_to_add = copy.copy(self.all_cards[card_index])
-        card_to_add.uuid = uuid.uuid4()  # Generate a new UUID for the card
         if target == 'player':
-            self.game_manager.current_match.player.hand.cards.append(card_to_add)
-            print(f"Added {card_to_add.name} to player's hand.")
+            card_to_add.uuid = self.game_manager.current_match.player.ids()  # Give the card a new id
+            self.game_manager.current_match.player.hand.add(card_to_add)
+            log.info("Debug Menu", f"Added {card_to_add.name} to player's hand.")
         elif target == 'enemy':
-            self.game_manager.current_match.enemy.hand.cards.append(card_to_add)
-            print(f"Added {card_to_add.name} to enemy's hand.")
+            card_to_add.uuid = self.game_manager.current_match.enemy.ids()
+            self.game_manager.current_match.enemy.hand.add(card_to_add)
+            log.info("Debug Menu", f"Added {card_to_add.name} to enemy's hand.")
         self.game_ui.init_animation_states()
+        self.game_ui.update()
 
     def modify_hp(self, target):
         new_hp = int(self.hp_input.text())
         if target == 'player':
             self.game_manager.current_match.player.hp = new_hp
-            print(f"Player HP set to {new_hp}.")
+            log.info("Debug Menu", f"Player HP set to {new_hp}.")
         elif target == 'enemy':
             self.game_manager.current_match.enemy.hp = new_hp
-            print(f"Enemy HP set to {new_hp}.")
+            log.info("Debug Menu", f"Enemy HP set to {new_hp}.")
+        self.game_ui.update()
 
     def modify_mana(self, target):
         new_mana = int(self.mana_input.text())
         if target == 'enemy':
             self.game_manager.current_match.enemy.mana = new_mana
-            print(f"Enemy mana set to {new_mana}.")
+            log.info("Debug Menu", f"Enemy mana set to {new_mana}.")
         elif target == 'player':
             self.game_manager.current_match.player.mana = new_mana
-            print(f"Player mana set to {new_mana}.")
+            log.info("Debug Menu", f"Player mana set to {new_mana}.")
+        self.game_ui.update()
 
     def win_battle(self):
         from Match import Phase  # Local import to avoid circular dependency
         self.game_manager.current_match.enemy.hp = 0
         self.game_manager.current_match.phase = Phase.ATTACKS
         self.game_manager.current_match.perform_phase()
+        self.game_ui.update()
 
     def lose_battle(self):
         from Match import Phase  # Local import to avoid circular dependency
         self.game_manager.current_match.player.hp = 0
         self.game_manager.current_match.phase = Phase.ATTACKS
         self.game_manager.current_match.perform_phase()
+        self.game_ui.update()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
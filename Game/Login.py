@@ -1,6 +1,5 @@
 import sys
 from PySide6.QtWidgets import QApplication, QWidget, QLineEdit, QPushButton, QVBoxLayout, QLabel, QMessageBox
-from GameUI import GameUI
 
 class Login(QWidget):
     def __init__(self):
@@ -57,6 +56,7 @@ class Login(QWidget):
             return False
 
     def launch_game(self, username):
+        from GameUI import GameUI  # Deferred so that the window shows before the game is loaded, see Game.py
         if self.role == 'debugger':  # Check the role
             self.game_ui = GameUI(debug_mode=True)
         else:
@@ -1,6 +1,19 @@
 from enum import Enum, auto
+from typing import NamedTuple, Optional
+
+from Card import CardRegistry, SimpleCard
+from EventLog import log
 from User import Enemy, Player
 
+# Effect plans a match keeps before starting over, see Match.effect_plan
+EFFECT_PLAN_CACHE_SIZE = 64
+
+
+def board_summary(deck):
+    """Return a compact (name, hp, attack) list of the cards in a deck, for logging."""
+    return [(card.name, card.hp, card.attack) for card in deck.cards]
+
+
 class Phase(Enum):
     DRAW = 1
     PLAY = 2
@@ -8,44 +21,189 @@ class Phase(Enum):
     EFFECTS = 4
     ATTACKS = 5
 
+class Step(NamedTuple):
+    """One resolved step of a phase, yielded by Match.advance.
+
+    kind is 'phase' when a phase has just been entered, 'effect' after a card's effect and 'attack' after a card's
+    attack. user and position are the owner and board slot of the card that acted, None for 'phase' steps.
+    """
+    phase: Phase
+    kind: str
+    user: Optional[object] = None
+    position: Optional[int] = None
+
+
 class Match:
-    def __init__(self, tier: int, player: Player, enemy: Enemy):
+    def __init__(self, tier: int, player: Player, enemy: Enemy, match_number: int = 1, replay=None,
+                 speculate_enemy: bool = False):
         self.winner = None
         self.match_over = False
         self.tier = tier
         self.player = player
         self.enemy = enemy
+        self.player.match = self
+        self.enemy.match = self
+        self.match_number = match_number
+        self.replay = replay  # ReplayLog recording the cards played, if any
+        # Whether the enemy works its turn out while the player plays, see User.speculate_turn. Worth it with a player
+        # taking their time, not in a headless run that goes straight on to ENEMY_PLAY
+        self.speculate_enemy = speculate_enemy
+        # Every card of both users by id, and the deck it is in
+        self.registry = CardRegistry()
+        self.effect_plans = {}  # (player board version, enemy board version) -> effect plan, see effect_plan
+        for user in (player, enemy):
+            for deck in (user.alive_deck, user.dead_deck, user.cards_on_board, user.hand):
+                self.registry.track(deck)
         self.turn = 1
         self.player_score = 0
         self.enemy_score = 0
         self.phase = Phase.DRAW  # Initialize the phase to DRAW
-        self.perform_phase()
-
         self.update_mana()
         # print(f"DEBUG: self.player.alive_deck.cards[0]: {self.player.alive_deck.cards[0]}")
 
+    def start(self):
+        """Draw the opening hands and go to the first PLAY phase."""
+        for step in self.start_steps():
+            pass
+
+    def start_steps(self):
+        """Generator version of start, yielding each step."""
+        yield from self.perform_phase_steps()
+        yield from self.advance()
+
+    def snapshot(self):
+        """Return the whole mutable state of the match as a compact tuple, cheap enough for search and rollouts.
+
+        Card objects are shared with the live match rather than copied, so a snapshot can only be restored onto the
+        match it was taken from.
+        """
+        return (self.winner, self.match_over, self.tier, self.turn, self.player_score, self.enemy_score, self.phase,
+                self.player.snapshot(), self.enemy.snapshot())
+
+    def restore(self, state: tuple):
+        """Put the match back into a state returned by snapshot."""
+        (self.winner, self.match_over, self.tier, self.turn, self.player_score, self.enemy_score, self.phase,
+         player_state, enemy_state) = state
+        self.player.restore(player_state)
+        self.enemy.restore(enemy_state)
+
+    def __getstate__(self):
+        # Effect plans are keyed by board versions, which an unpickled match does not keep
+        state = self.__dict__.copy()
+        state['effect_plans'] = {}
+        return state
+
     def update_mana(self):
         self.player.mana = self.tier + 3
         self.enemy.mana = self.tier + 3
 
     def activate_effects(self):
-        # Take the maximum of player's cards on board vs enemy's cards on board
-        self.max_hands = max(len(self.player.cards_on_board.cards), len(self.enemy.cards_on_board.cards))
-        for i in range(self.max_hands):
-            if i < self.max_hands:
-                # If there is a card, activate the effect
-                if i < len(self.player.cards_on_board.cards):
-                    print(f"DEBUG: Activating player card {self.player.cards_on_board.cards[i].name}.")
-                    self.player.cards_on_board.cards[i].activate_effect(i, self.player.cards_on_board,
-                                                                        self.enemy.cards_on_board)
-                if i < len(self.enemy.cards_on_board.cards):
-                    print(f"DEBUG: Activating enemy card {self.enemy.cards_on_board.cards[i].name}.")
-                    self.enemy.cards_on_board.cards[i].activate_effect(i, self.enemy.cards_on_board,
-                                                                       self.player.cards_on_board)
-                self.max_hands = max(len(self.player.cards_on_board.cards), len(self.enemy.cards_on_board.cards))
+        for step in self.effect_steps():
+            pass
+
+    def effect_plan(self):
+        """Return the effect plan for the boards as they are: the effects phase worked out ahead of time.
+
+        The plan is a list of (user, position, card, handler, friendly board, enemy board, target) in the order the
+        effects are activated, where handler is the card's activate_effect (None for cards without an effect) and
+        target is the unit in front of the card, or the enemy player. None of it depends on anything but the order of
+        the cards on the boards, so plans are kept by board version and reused for as long as no card enters, leaves
+        or moves, including by rollouts that restore a snapshot of the match.
+        """
+        player_board, enemy_board = self.player.cards_on_board, self.enemy.cards_on_board
+        key = (player_board.version, enemy_board.version)
+        plan = self.effect_plans.get(key)
+        if plan is not None:
+            return plan
+        plan = []
+        player_cards, enemy_cards = player_board.cards, enemy_board.cards
+        player_count, enemy_count = len(player_cards), len(enemy_cards)
+        for i in range(max(player_count, enemy_count)):
+            # As Deck.facing, without a call for every card
+            player_card = player_cards[i] if i < player_count else player_board.owner
+            enemy_card = enemy_cards[i] if i < enemy_count else enemy_board.owner
+            if i < player_count:
+                handler = None if isinstance(player_card, SimpleCard) else player_card.activate_effect
+                plan.append((self.player, i, player_card, handler, player_board, enemy_board, enemy_card))
+            if i < enemy_count:
+                handler = None if isinstance(enemy_card, SimpleCard) else enemy_card.activate_effect
+                plan.append((self.enemy, i, enemy_card, handler, enemy_board, player_board, player_card))
+        if len(self.effect_plans) >= EFFECT_PLAN_CACHE_SIZE:
+            self.effect_plans.clear()
+        self.effect_plans[key] = plan
+        return plan
+
+    def effect_steps(self):
+        """Generator activating the effects of the cards on the board, yielding after each one.
+
+        Each index of the boards is visited once, from left to right, up to the length of the longer board at the
+        start of the phase. A card summoned during the phase goes in right after its summoner and pushes the cards
+        after it along, so it gets its turn next and the last cards may be pushed out of the phase. Until a card is
+        summoned the phase follows the effect plan of the boards; after that it goes on by reading the boards directly.
+        """
+        player_board, enemy_board = self.player.cards_on_board, self.enemy.cards_on_board
+        player_version, enemy_version = player_board.version, enemy_board.version
+        max_hands = max(len(player_board), len(enemy_board))
+        for user, position, card, handler, friendly_board, opposing_board, target in self.effect_plan():
+            if log.debug_enabled:
+                log.debug("Match", f"Activating {'player' if user is self.player else 'enemy'} card {card.name}.")
+            if handler is not None:
+                handler(position, friendly_board, opposing_board, target)
+            yield Step(Phase.EFFECTS, 'effect', user, position)
+            if player_board.version != player_version or enemy_board.version != enemy_version:
+                # A card was summoned, so the rest of the plan no longer lines up with the boards
+                if user is self.player:
+                    yield from self._effect_steps_from(position, max_hands, player_done=True)
+                else:
+                    yield from self._effect_steps_from(position + 1, max_hands)
+                return
+
+    def _effect_steps_from(self, start: int, max_hands: int, player_done: bool = False):
+        """Carry on with the effects phase from the given index without a plan. player_done skips the player's card at
+        the start index, for when it has already been activated."""
+        player_board, enemy_board = self.player.cards_on_board, self.enemy.cards_on_board
+        for i in range(start, max_hands):
+            # If there is a card, activate the effect
+            if i < len(player_board) and not (player_done and i == start):
+                card = player_board[i]
+                if log.debug_enabled:
+                    log.debug("Match", f"Activating player card {card.name}.")
+                card.activate_effect(i, player_board, enemy_board)
+                yield Step(Phase.EFFECTS, 'effect', self.player, i)
+            if i < len(enemy_board):
+                card = enemy_board[i]
+                if log.debug_enabled:
+                    log.debug("Match", f"Activating enemy card {card.name}.")
+                card.activate_effect(i, enemy_board, player_board)
+                yield Step(Phase.EFFECTS, 'effect', self.enemy, i)
 
     def cycle_phase(self):
-        """Cycle the phase to the next phase."""
+        """Cycle the phase to the next phase, resolving it all at once."""
+        for step in self.advance():
+            pass
+
+    def advance(self):
+        """Generator cycling to the next phase and performing it, yielding after each step.
+
+        Nothing happens until the generator is iterated, so a caller can resolve the phase at its own pace: a headless
+        runner drains it in a loop (which is all cycle_phase does) while the UI can take one step per frame. The DRAW
+        phase goes on to PLAY by itself, as cards can't be played during it.
+        """
+        self.next_phase()
+        yield from self.perform_phase_steps()
+        if self.phase == Phase.DRAW:
+            self.next_phase()
+            yield from self.perform_phase_steps()
+
+    async def advance_async(self, delay: float = 0):
+        """Asynchronous version of advance, waiting delay seconds after each step so other tasks can run."""
+        import asyncio  # Deferred, as it takes longer to import than the rest of the rules engine put together
+        for step in self.advance():
+            yield step
+            await asyncio.sleep(delay)
+
+    def next_phase(self):
+        """Move to the next phase without performing it."""
         if self.phase == Phase.DRAW:
             self.phase = Phase.PLAY
         elif self.phase == Phase.PLAY:
@@ -56,85 +214,120 @@ class Match:
             self.phase = Phase.ATTACKS
         elif self.phase == Phase.ATTACKS:
             self.phase = Phase.DRAW
-        self.perform_phase()
 
     def perform_attacks(self):
+        for step in self.attack_steps():
+            pass
+
+    def attack_steps(self):
+        """Generator performing the attacks of the cards on the board, yielding after each one."""
         # Take the maximum of player's hands on board vs enemy's hands on board
-        print(f"DEBUG: Player cards on board BEFORE ATTACKS: {self.player.cards_on_board}")
-        print(f"DEBUG: Enemy cards on board BEFORE ATTACKS: {self.enemy.cards_on_board}")
+        if log.debug_enabled:
+            log.debug("Match", "Cards on board BEFORE ATTACKS", player=board_summary(self.player.cards_on_board),
+                      enemy=board_summary(self.enemy.cards_on_board))
 
-        max_hands = max(len(self.player.cards_on_board.cards), len(self.enemy.cards_on_board.cards))
+        player_board, enemy_board = self.player.cards_on_board, self.enemy.cards_on_board
+        player_cards, enemy_cards = player_board.cards, enemy_board.cards
+        max_hands = max(len(player_cards), len(enemy_cards))
         for i in range(max_hands):
-            if i < len(self.enemy.cards_on_board.cards):
-                print(f"DEBUG: Enemy attacking with card {self.enemy.cards_on_board.cards[i].name}.")
-                self.enemy.cards_on_board.cards[i].perform_attack(i, self.player.cards_on_board)
-            if i < len(self.player.cards_on_board.cards):
-                print(f"DEBUG: Player attacking with card {self.player.cards_on_board.cards[i].name}.")
-                self.player.cards_on_board.cards[i].perform_attack(i, self.enemy.cards_on_board)
+            if i < len(enemy_cards):
+                if log.debug_enabled:
+                    log.debug("Match", f"Enemy attacking with card {enemy_cards[i].name}.")
+                enemy_cards[i].perform_attack(i, player_board)
+                yield Step(Phase.ATTACKS, 'attack', self.enemy, i)
+            if i < len(player_cards):
+                if log.debug_enabled:
+                    log.debug("Match", f"Player attacking with card {player_cards[i].name}.")
+                player_cards[i].perform_attack(i, enemy_board)
+                yield Step(Phase.ATTACKS, 'attack', self.player, i)
 
-        print(f"DEBUG: Player cards on board AFTER ATTACKS: {self.player.cards_on_board}")
-        print(f"DEBUG: Enemy cards on board AFTER ATTACKS: {self.enemy.cards_on_board}")
+        if log.debug_enabled:
+            log.debug("Match", "Cards on board AFTER ATTACKS", player=board_summary(self.player.cards_on_board),
+                      enemy=board_summary(self.enemy.cards_on_board))
 
     def draw_new_cards(self):
         # Clear dead cards from the board
         player_dead_cards = []
         for card in self.player.cards_on_board.cards:
             if card.hp <= 0:
-                self.player.dead_deck.cards.append(card)
+                self.player.dead_deck.add(card)
                 player_dead_cards.append(card)
 
         enemy_dead_cards = []
         for card in self.enemy.cards_on_board.cards:
             if card.hp <= 0:
-                self.enemy.dead_deck.cards.append(card)
+                self.enemy.dead_deck.add(card)
                 enemy_dead_cards.append(card)
 
         # Remove dead cards from the board
         for card in player_dead_cards:
-            self.player.cards_on_board.cards.remove(card)
+            self.player.cards_on_board.remove(card)
 
         for card in enemy_dead_cards:
-            self.enemy.cards_on_board.cards.remove(card)
+            self.enemy.cards_on_board.remove(card)
 
         # Draw as many cards as the player's hand size minus the number of cards in the player's hand
-        for i in range(self.player.hand_size - len(self.player.hand.cards)):
+        for i in range(self.player.hand_size - len(self.player.hand)):
             self.player.draw_card()
-        for i in range(self.enemy.hand_size - len(self.enemy.hand.cards)):
+        for i in range(self.enemy.hand_size - len(self.enemy.hand)):
             self.enemy.draw_card()
 
 
     def perform_phase(self):
+        """Perform the current phase, resolving it all at once."""
+        for step in self.perform_phase_steps():
+            pass
+
+    def perform_phase_steps(self):
+        """Generator performing the current phase, yielding after entering it and after each effect and attack."""
         if self.phase == Phase.DRAW:
             self.draw_new_cards()
-            print("DEBUG: Phase is now DRAW.")
-            self.cycle_phase()  # You shouldn't be able to play cards during the draw phase so cycle to the next phase automatically.
+            if log.debug_enabled:
+                log.debug("Match", "Phase is now DRAW.")
         elif self.phase == Phase.PLAY:
-            print("DEBUG: Phase is now PLAY.")
+            if log.debug_enabled:
+                log.debug("Match", "Phase is now PLAY.")
+            if self.replay is not None:
+                self.replay.begin_turn(self)
+            if self.speculate_enemy:
+                self.enemy.speculate_turn()
         elif self.phase == Phase.ENEMY_PLAY:
-            print("DEBUG: Phase is now ENEMY_PLAY.")
+            if log.debug_enabled:
+                log.debug("Match", "Phase is now ENEMY_PLAY.")
             self.enemy.play_turn()
         elif self.phase == Phase.EFFECTS:
-            print("DEBUG: Phase is now EFFECTS.")
-            self.activate_effects()
+            if log.debug_enabled:
+                log.debug("Match", "Phase is now EFFECTS.")
+            yield Step(Phase.EFFECTS, 'phase')
+            yield from self.effect_steps()
+            return
         elif self.phase == Phase.ATTACKS:
-            print("DEBUG: Phase is now ATTACKS.")
-            self.perform_attacks()
+            if log.debug_enabled:
+                log.debug("Match", "Phase is now ATTACKS.")
+            yield Step(Phase.ATTACKS, 'phase')
+            yield from self.attack_steps()
             self.update_mana()
             self.turn += 1
             self.check_win_conditions()
+            return
         else:
-            print("DEBUG: ERROR: Phase is not a valid phase.")
+            log.error("Match", "Phase is not a valid phase.", phase=self.phase)
+            return
+        yield Step(self.phase, 'phase')
 
     def check_win_conditions(self):
         if self.player.hp <= 0 and self.enemy.hp <= 0:
-            print("DEBUG: Draw.")
+            if log.debug_enabled:
+                log.debug("Match", "Draw.")
             self.end_match(None)
         elif self.enemy.hp <= 0:
-            print("DEBUG: Player has won.")
+            if log.debug_enabled:
+                log.debug("Match", "Player has won.")
             self.player_score += 1
             self.end_match(self.player)
         elif self.player.hp <= 0:
-            print("DEBUG: Player has lost.")
+            if log.debug_enabled:
+                log.debug("Match", "Player has lost.")
             self.enemy_score += 1
             self.end_match(self.enemy)
 
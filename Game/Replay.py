@@ -0,0 +1,273 @@
+"""Replay logs for reproducing runs bit-for-bit.
+
+A run is fully determined by its seed and the cards that were played, so a ReplayLog only records those: the seed,
+then one (match number, turn, phase, side, hand index) action per card played. Every few turns it also appends a
+keyframe holding the whole state of the match as plain data. A Replayer re-simulates the run from the seed, or starts
+from the nearest keyframe before the requested turn instead of replaying from turn 1.
+
+Recording:
+    replay = ReplayLog(seed)
+    game_manager = GameManager(seed=seed, replay=replay)
+    ...
+    replay.save('run.json')
+
+Replaying:
+    game_manager = Replayer(ReplayLog.load('run.json')).seek(match_number=3, turn=5)
+"""
+import copy
+import json
+import random
+from collections import defaultdict
+
+from Card import TimeLord, cards_list
+from GameManager import GameManager
+from Match import Phase
+from Seeding import spawn_seed
+
+PLAYER = 0
+ENEMY = 1
+STREAMS = ('player', 'enemy')  # Paths of the users' random streams under their match, see GameManager.build_match
+WORDS_PER_TWIST = 624  # 32-bit words the Mersenne Twister hands out between two twists of its state
+MAX_TWISTS = 1000  # Far more than a match draws, so a stream that is not derived from the seed is found out
+
+_prototypes = {card.name: card for card in cards_list}
+
+
+def _encode_card(card, owners: dict):
+    state = list(card.snapshot())
+    if isinstance(card, TimeLord):
+        # Time Lord remembers the unit (or the owner) it is waiting to destroy, stored by id
+        target = state[-2]
+        if target is None:
+            state[-2] = None
+        elif target in owners:
+            state[-2] = ['owner', owners[target]]
+        else:
+            state[-2] = ['card', target.uuid]
+    return [card.name] + state
+
+
+def _stream_position(rng, seed):
+    """Return how many 32-bit words rng has handed out since it was seeded with seed.
+
+    The stream is derived again from the seed a twist at a time until it is in the state rng is in, so this takes time
+    proportional to the draws. Raises ValueError if rng is not on the stream of the seed.
+    """
+    version, internal_state, gauss = rng.getstate()
+    key, index = internal_state[:-1], internal_state[-1]
+    stream = random.Random(seed)
+    for twists in range(MAX_TWISTS):
+        if stream.getstate()[1][:-1] == key:
+            # Seeding leaves the index at the end of the state, so the first draw twists it
+            return (twists - 1) * WORDS_PER_TWIST + index
+        stream.getrandbits(32 * WORDS_PER_TWIST)
+    raise ValueError("The random stream is not derived from the given seed.")
+
+
+def capture_keyframe(match, seed):
+    """Return the whole state of the match, at the start of its PLAY phase, as JSON-compatible data.
+
+    The users' random streams are derived from the seed of the run, so they are kept as how far they were drawn.
+    """
+    owners = {match.player: PLAYER, match.enemy: ENEMY}
+    users = []
+    for user, stream in zip((match.player, match.enemy), STREAMS):
+        users.append({
+            'hp': user.hp,
+            'mana': user.mana,
+            'shield': user.shield,
+            'frozen': user.frozen,
+            'draws': _stream_position(user.rng, spawn_seed(seed, match.match_number, stream)),
+            'next_id': user.ids.next_id,
+            'decks': [[_encode_card(card, owners) for card in deck.cards]
+                      for deck in (user.alive_deck, user.dead_deck, user.cards_on_board, user.hand)],
+            'shuffled': [deck.shuffled for deck in (user.alive_deck, user.dead_deck, user.cards_on_board, user.hand)],
+        })
+    return {
+        'match_number': match.match_number,
+        'tier': match.tier,
+        'turn': match.turn,
+        'player_score': match.player_score,
+        'enemy_score': match.enemy_score,
+        'users': users,
+    }
+
+
+def restore_keyframe(seed, keyframe: dict):
+    """Build a GameManager positioned at the keyframe, as if the run had been played up to it."""
+    game_manager = GameManager(seed=seed)
+    match_number = keyframe['match_number']
+    # A run only goes on to the next match after a win
+    game_manager.current_match_number = match_number
+    game_manager.tier = keyframe['tier']
+    game_manager.player_wins = match_number - 1
+    game_manager.player_losses = 0
+
+    match = game_manager.current_match
+    match.match_number = match_number
+    match.tier = keyframe['tier']
+    match.turn = keyframe['turn']
+    match.player_score = keyframe['player_score']
+    match.enemy_score = keyframe['enemy_score']
+    match.phase = Phase.PLAY
+
+    owners = [match.player, match.enemy]
+    cards_by_id = {}
+    time_lords = []
+    for user, stream, state in zip(owners, STREAMS, keyframe['users']):
+        user.hp, user.mana, user.shield, user.frozen = state['hp'], state['mana'], state['shield'], state['frozen']
+        user.rng.seed(spawn_seed(seed, match_number, stream))
+        user.rng.getrandbits(32 * state['draws'])  # One word per 32 bits, the same as the draws it stands for
+        user.ids.next_id = state['next_id']
+        for deck, encoded_cards, shuffled in zip((user.alive_deck, user.dead_deck, user.cards_on_board, user.hand),
+                                                 state['decks'], state['shuffled']):
+            deck.clear()
+            for name, card_id, *card_state in encoded_cards:
+                card = copy.copy(_prototypes[name])
+                card.uuid = card_id  # Set before the card goes into a deck, as that indexes it by id
+                if isinstance(card, TimeLord):
+                    time_lords.append((card, card_id, card_state))
+                else:
+                    card.restore(tuple([card_id] + card_state))
+                cards_by_id[card_id] = card
+                deck.add(card)
+            deck.shuffled = shuffled
+    for card, card_id, card_state in time_lords:
+        target = card_state[-2]
+        if target is not None:
+            kind, target_id = target
+            card_state[-2] = owners[target_id] if kind == 'owner' else cards_by_id.get(target_id)
+        card.restore(tuple([card_id] + card_state))
+    return game_manager
+
+
+class ReplayLog:
+    """Append-only record of a run: its seed, every card played, and periodic keyframes."""
+
+    def __init__(self, seed, keyframe_interval: int = 5):
+        self.seed = seed
+        self.keyframe_interval = keyframe_interval  # A keyframe is taken every this many turns of each match
+        self.actions = []  # (match number, turn, phase, side, hand index) for every card played
+        self.keyframes = []  # Plain-data match states, in the order they were taken
+        self.last_position = (1, 1)  # The (match number, turn) of the last PLAY phase reached
+        self.finished = False  # Whether the run reached game over, which means its last turn was played out
+
+    def record_play(self, match, user, hand_index: int):
+        """Record that the user played the card at hand_index of its hand."""
+        side = ENEMY if user is match.enemy else PLAYER
+        self.actions.append((match.match_number, match.turn, match.phase.value, side, hand_index))
+
+    def begin_turn(self, match):
+        """Called by Match at the start of every PLAY phase."""
+        self.last_position = (match.match_number, match.turn)
+        if (match.turn - 1) % self.keyframe_interval == 0:
+            self.keyframes.append(capture_keyframe(match, self.seed))
+
+    def end_run(self):
+        """Called by GameManager when the player loses and the run is over."""
+        self.finished = True
+
+    def save(self, path: str):
+        with open(path, 'w') as file:
+            json.dump({
+                'seed': self.seed,
+                'keyframe_interval': self.keyframe_interval,
+                'last_position': self.last_position,
+                'finished': self.finished,
+                'actions': self.actions,
+                'keyframes': self.keyframes,
+            }, file, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, 'r') as file:
+            data = json.load(file)
+        replay = cls(data['seed'], data['keyframe_interval'])
+        replay.last_position = tuple(data['last_position'])
+        replay.finished = data['finished']
+        replay.actions = [tuple(action) for action in data['actions']]
+        replay.keyframes = data['keyframes']
+        return replay
+
+
+class Replayer:
+    """Re-simulates a recorded run, feeding both sides the cards they played in the recording."""
+
+    def __init__(self, replay: ReplayLog):
+        self.replay = replay
+        self.plays = defaultdict(list)
+        for match_number, turn, phase, side, hand_index in replay.actions:
+            self.plays[(match_number, turn, phase, side)].append(hand_index)
+        self.game_manager = None
+
+    def _recorded_cards(self, user, mana: int, hand: list):
+        """Strategy for the enemy: the cards it played at this point of the recording."""
+        match = user.match
+        # The recorded indices are positions in the hand itself, not in the sorted copy the strategy is given
+        remaining = list(user.hand.cards)
+        hand_indices = self.plays.get((match.match_number, match.turn, match.phase.value, ENEMY), ())
+        return [remaining.pop(i) for i in hand_indices]
+
+    def _prepare(self, match):
+        match.enemy.strategy = self._recorded_cards
+
+    def _play_recorded(self, match):
+        for hand_index in self.plays.get((match.match_number, match.turn, match.phase.value, PLAYER), ()):
+            match.player.play_card(match.player.hand.cards[hand_index])
+
+    def _position(self):
+        return self.game_manager.current_match_number, self.game_manager.current_match.turn
+
+    def _latest_keyframe(self, position: tuple):
+        """Return the latest keyframe at or before the position, or None."""
+        latest = None
+        for keyframe in self.replay.keyframes:
+            if (keyframe['match_number'], keyframe['turn']) <= position:
+                latest = keyframe
+        return latest
+
+    def _start(self, keyframe):
+        """Start from the keyframe, or from the beginning of the run if there is none."""
+        if keyframe is not None:
+            self.game_manager = restore_keyframe(self.replay.seed, keyframe)
+        else:
+            self.game_manager = GameManager(seed=self.replay.seed)
+        self._prepare(self.game_manager.current_match)
+
+    def step_turn(self):
+        """Play the current turn as recorded, from its PLAY phase to the next one (or to the next match)."""
+        game_manager = self.game_manager
+        match = game_manager.current_match
+        self._play_recorded(match)
+        # PLAY -> ENEMY_PLAY -> EFFECTS -> ATTACKS
+        for i in range(3):
+            match.cycle_phase()
+            self._play_recorded(match)
+        if match.match_over:
+            game_manager.check_match()
+            if not game_manager.game_over:
+                self._prepare(game_manager.current_match)
+        else:
+            # ATTACKS -> DRAW, which cycles on to PLAY by itself
+            match.cycle_phase()
+
+    def seek(self, match_number: int, turn: int):
+        """Return the GameManager at the start of the PLAY phase of the given turn."""
+        position = (match_number, turn)
+        keyframe = self._latest_keyframe(position)
+        keyframe_position = (keyframe['match_number'], keyframe['turn']) if keyframe is not None else (1, 1)
+        # Carry on from where the replay is if that is closer than any keyframe
+        if (self.game_manager is None or self.game_manager.game_over or self._position() > position
+                or self._position() < keyframe_position):
+            self._start(keyframe)
+        while not self.game_manager.game_over and self._position() < position:
+            self.step_turn()
+        return self.game_manager
+
+    def run(self):
+        """Replay the whole recording and return the GameManager at its end."""
+        game_manager = self.seek(*self.replay.last_position)
+        # A run that was left midway stops at the PLAY phase it was left at
+        if self.replay.finished and not game_manager.game_over:
+            self.step_turn()
+        return self.game_manager
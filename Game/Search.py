@@ -0,0 +1,415 @@
+"""Monte-Carlo tree search over the cards to play, for a harder opponent than the knapsack strategy.
+
+The knapsack strategy only spends as much mana as it can. A MonteCarloSearch instead tries lines of play out: it plays
+the rest of the match forward from the current state a few turns at a time (a rollout), over and over until its time
+budget is spent, and picks the cards whose rollouts went best. That way it sees what the board does with the cards,
+such as which unit a Malik or a Nomnom ends up next to.
+
+The tree is open loop: a node stands for a sequence of cards played (by card name, with None ending a turn) rather
+than for a state, and the turns of the other side are left to the rollout policy. Every rollout restores the match
+from a snapshot and reshuffles the decks first, so the search does not peek at the draws to come. Once the cards of a
+turn are picked, the part of the tree below them becomes the tree of the next turn.
+
+Rollouts also run in a pool of worker processes, shared by every search, each searching a pickled copy of the match.
+Their trees are merged into the main one when the time is up, and the trees of workers that are late are dropped.
+
+With a player taking their time, the enemy's turn is also searched ahead on a thread while the player plays, from a
+copy of the match in which the player played by the rollout policy (see MonteCarloSearch.speculate).
+
+Usage:
+    enemy.strategy = 'mcts'  # Registered in Strategy, with one search per user
+    enemy.strategy = MonteCarloSearch(time_budget=0.05, workers=0)
+"""
+import math
+import multiprocessing
+import os
+import pickle
+import random
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from EventLog import WARNING, log
+from Match import Phase
+
+_pool = None  # Worker processes shared by every search, see _worker_pool
+_pool_size = 0
+_speculator = None  # Thread searching turns ahead of time, see MonteCarloSearch.speculate. Started on first use
+
+
+class Node:
+    """Statistics of a sequence of plays: how many rollouts went through it and their total result."""
+
+    __slots__ = ('visits', 'value', 'children')
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0  # Sum of the results of the rollouts, from 0 (lost) to 1 (won)
+        self.children = {}  # Card name, or None to end the turn -> Node
+
+    def merge(self, other):
+        """Add the statistics of another tree over the same plays to this one."""
+        self.visits += other.visits
+        self.value += other.value
+        for action, other_child in other.children.items():
+            child = self.children.get(action)
+            if child is None:
+                self.children[action] = other_child
+            else:
+                child.merge(other_child)
+
+
+def evaluate(match, user):
+    """Return how good the match looks for the user, from 0 (lost) to 1 (won)."""
+    if match.match_over:
+        if match.winner is None:
+            return 0.5
+        return 1.0 if match.winner is user else 0.0
+    opponent = match.enemy if user is match.player else match.player
+    own_board, other_board = user.cards_on_board, opponent.cards_on_board
+    score = (user.hp - opponent.hp
+             + 0.1 * (own_board.total_hp + own_board.total_attack - other_board.total_hp - other_board.total_attack))
+    return 0.5 + 0.5 * math.tanh(score / 10)
+
+
+def _search_in_worker(job):
+    """Search a pickled copy of a match in a worker process and return the tree."""
+    payload, is_enemy, settings = job
+    match = pickle.loads(payload)
+    user = match.enemy if is_enemy else match.player
+    search = MonteCarloSearch(workers=0, **settings)
+    return search.search(user, user.mana, sorted(user.hand.cards, key=lambda card: card.tier, reverse=True))
+
+
+def _position(match):
+    """Return the position the enemy's turn is searched from as plain values, which compare across copies of a match.
+
+    The order of the decks is left out, as every rollout draws them in a new order anyway.
+    """
+    users = []
+    for user in (match.player, match.enemy):
+        board = tuple((card.uuid, card.name, card.hp, card.attack, card.temp_hp, card.temp_attack, card.attack_times,
+                       card.flags) for card in user.cards_on_board.cards)
+        hand = tuple(card.name for card in user.hand.cards)
+        decks = tuple(sorted(card.name for card in user.alive_deck.cards)), len(user.dead_deck)
+        users.append((user.hp, user.mana, user.shield, user.frozen, user.ids.next_id, board, hand, decks))
+    return match.turn, match.phase, match.match_over, tuple(users)
+
+
+def _speculate_in_copy(match, search):
+    """Job of the speculation thread: play the player's turn in a copy of the match by the search's rollout policy,
+    search the enemy's turn from there and return the position it was searched from and for how long."""
+    match.player.strategy = search.rollout_policy
+    match.player.play_turn()
+    if match.match_over:
+        return None
+    match.next_phase()
+    enemy = match.enemy
+    started = time.perf_counter()
+    position = _position(match)
+    search.search(enemy, enemy.mana, sorted(enemy.hand.cards, key=lambda card: card.tier, reverse=True))
+    return position, time.perf_counter() - started
+
+
+def _worker_pool(workers: int):
+    """Return the pool shared by every search, started on first use with at least the given number of processes."""
+    global _pool, _pool_size
+    if _pool is None or _pool_size < workers:
+        if _pool is not None:
+            _pool.terminate()
+        _pool = multiprocessing.Pool(workers)
+        _pool_size = workers
+    return _pool
+
+
+class MonteCarloSearch:
+    """A strategy searching the cards to play with Monte-Carlo tree search. Call it as strategy(user, mana, hand).
+
+    Attributes:
+        time_budget (float): Seconds spent searching per turn.
+        max_rollouts (int): Stop after this many rollouts in this process even if there is time left. None for no limit.
+        horizon (int): How many turns each rollout plays forward before the match is judged by evaluate.
+        exploration (float): The UCB1 exploration constant. Higher values try the less promising plays more often.
+        workers (int): Worker processes running rollouts alongside this one. None for one per spare core.
+        rollout_policy: The strategy playing both sides once a rollout leaves the tree.
+        root (Node): The tree of the last search, or of the next turn once its cards have been picked.
+    """
+
+    def __init__(self, time_budget: float = 0.08, max_rollouts=None, horizon: int = 2, exploration: float = 1.4,
+                 workers=None, seed=None, rollout_policy=None):
+        if rollout_policy is None:
+            from Strategy import knapsack  # Deferred, as Strategy imports this module lazily too
+            rollout_policy = knapsack
+        self.time_budget = time_budget
+        self.max_rollouts = max_rollouts
+        self.horizon = horizon
+        self.exploration = exploration
+        self.workers = workers if workers is not None else max(0, (os.cpu_count() or 1) - 1)
+        self.rng = random.Random(seed)
+        self.rollout_policy = rollout_policy
+        self.root = None
+        self._next_root = None  # (weak reference to the match, turn, tree) kept for the next turn of the match
+        self._speculation = None  # (weak reference to the match, turn, search, future) of the turn searched ahead
+        self._stopped = False  # Set by stop, from another thread
+        # Where the current rollout is in the tree, None once it has left it
+        self._node = None
+        self._path = []
+
+    def __call__(self, user, mana: int, hand: list):
+        match = user.match
+        if match is None or match.match_over or not self._is_turn_of(match, user):
+            # Nothing to search from, such as a hand looked at outside of a match
+            return self.rollout_policy(user, mana, hand)
+        budget = self._take_speculation(match)
+        if budget > 0:
+            self.search(user, mana, hand, budget)
+        else:
+            self.root = self._next_root[2]
+            self._next_root = None
+        return self._pick(match, user, mana, hand)
+
+    def _is_turn_of(self, match, user):
+        if user is match.enemy:
+            return match.phase == Phase.ENEMY_PLAY
+        return user is match.player and match.phase == Phase.PLAY
+
+    def search(self, user, mana: int, hand: list, time_budget=None):
+        """Run rollouts from the current state of the user's match until the budget is spent and return the tree.
+
+        time_budget overrides the search's own for this search. The match is left exactly as it was found.
+        """
+        match = user.match
+        deadline = time.perf_counter() + (self.time_budget if time_budget is None else time_budget)
+        root = None
+        if self._next_root is not None:
+            next_match, next_turn, next_tree = self._next_root
+            if next_match() is match and next_turn == match.turn:
+                root = next_tree
+        self._next_root = None
+        self.root = root if root is not None else Node()
+
+        users = (match.player, match.enemy)
+        strategies = [other.strategy for other in users]
+        replay, speculate_enemy, level = match.replay, match.speculate_enemy, log.level
+        # Rollouts are not recorded, speculated on or logged, and the other side plays by the rollout policy
+        match.replay = None
+        match.speculate_enemy = False
+        if level < WARNING:
+            # Only set when it has to be, as a search speculating on another thread would set it back behind our back
+            log.set_level(WARNING)
+        for other in users:
+            other.strategy = self.rollout_policy
+        state = match.snapshot()
+        pending = None
+        try:
+            pending = self._start_workers(match, user, deadline)
+            user.strategy = self._select
+            self._rollouts(match, user, mana, hand, state, deadline)
+        finally:
+            match.restore(state)
+            for other, strategy in zip(users, strategies):
+                other.strategy = strategy
+            match.replay = replay
+            match.speculate_enemy = speculate_enemy
+            if level < WARNING:
+                log.set_level(level)
+        if pending is not None:
+            try:
+                for tree in pending.get(max(0.0, deadline - time.perf_counter())):
+                    self.root.merge(tree)
+            except multiprocessing.TimeoutError:
+                pass  # Late workers only cost their rollouts, the turn does not wait for them
+        return self.root
+
+    def _start_workers(self, match, user, deadline: float):
+        """Hand a copy of the match to every worker and return the pending result, or None without workers."""
+        # Worker processes of a pool (such as the simulator's) cannot start a pool of their own
+        if not self.workers or multiprocessing.current_process().daemon:
+            return None
+        pool = _worker_pool(self.workers)
+        payload = pickle.dumps(match, pickle.HIGHEST_PROTOCOL)
+        # Leave the workers a little time to send their trees back before the deadline
+        budget = max(0.0, (deadline - time.perf_counter()) * 0.8)
+        jobs = []
+        for i in range(self.workers):
+            settings = {'time_budget': budget, 'max_rollouts': self.max_rollouts, 'horizon': self.horizon,
+                        'exploration': self.exploration, 'seed': self.rng.getrandbits(64),
+                        'rollout_policy': self.rollout_policy}
+            jobs.append((payload, user is match.enemy, settings))
+        return pool.map_async(_search_in_worker, jobs)
+
+    def _rollouts(self, match, user, mana: int, hand: list, state: tuple, deadline: float):
+        rollouts = 0
+        end_turn = match.turn + self.horizon
+        users = (match.player, match.enemy)
+        while (not self._stopped and time.perf_counter() < deadline
+               and (self.max_rollouts is None or rollouts < self.max_rollouts)):
+            if rollouts:
+                match.restore(state)
+            # Deal the unknown: every deck is drawn in a new order
+            for other in users:
+                other.rng.seed(self.rng.getrandbits(64))
+                if len(other.alive_deck):
+                    other.alive_deck.shuffle()
+            self._node = self.root
+            self._path = [self.root]
+            for card in self._select(user, mana, hand):
+                user.play_card(card)
+            while not match.match_over and match.turn < end_turn:
+                match.cycle_phase()
+                # The enemy plays by itself when its phase comes, the player has to be told to
+                if match.phase == Phase.PLAY and not match.match_over:
+                    match.player.play_turn()
+            result = evaluate(match, user)
+            for node in self._path:
+                node.visits += 1
+                node.value += result
+            rollouts += 1
+
+    def _select(self, user, mana: int, hand: list):
+        """The user's strategy during a rollout: follow the tree down with UCB1 and add one node to it.
+
+        Once the rollout has left the tree the rollout policy picks the cards instead.
+        """
+        if self._node is None:
+            return self.rollout_policy(user, mana, hand)
+        chosen = []
+        remaining = list(hand)
+        while True:
+            node = self._node
+            playable = {}
+            for card in remaining:
+                if card.tier <= mana and card.name not in playable:
+                    playable[card.name] = card
+            actions = list(playable)
+            actions.append(None)
+            untried = [action for action in actions if action not in node.children]
+            if untried:
+                action = self.rng.choice(untried)
+                child = node.children[action] = Node()
+                self._node = None
+            else:
+                log_visits = math.log(node.visits)
+                action = max(actions, key=lambda action: self._ucb(node.children[action], log_visits))
+                child = node.children[action]
+                self._node = child
+            self._path.append(child)
+            if action is None:
+                return chosen
+            card = playable[action]
+            chosen.append(card)
+            remaining.remove(card)
+            mana -= card.tier
+            if self._node is None:
+                return chosen + self.rollout_policy(user, mana, remaining)
+
+    def _ucb(self, node: Node, log_visits: float):
+        return node.value / node.visits + self.exploration * math.sqrt(log_visits / node.visits)
+
+    def _pick(self, match, user, mana: int, hand: list):
+        """Return the cards of the most visited line of the tree, and keep the tree below it for the next turn."""
+        chosen = []
+        remaining = list(hand)
+        node = self.root
+        while True:
+            playable = {}
+            for card in remaining:
+                if card.tier <= mana and card.name not in playable:
+                    playable[card.name] = card
+            actions = [action for action in playable if action in node.children]
+            if None in node.children:
+                actions.append(None)
+            if not actions:
+                # The search never got this far down, so the rest is up to the rollout policy
+                return chosen + self.rollout_policy(user, mana, remaining)
+            action = max(actions, key=lambda action: node.children[action].visits)
+            node = node.children[action]
+            if action is None:
+                self._next_root = (weakref.ref(match), match.turn + 1, node)
+                return chosen
+            card = playable[action]
+            chosen.append(card)
+            remaining.remove(card)
+            mana -= card.tier
+
+    def speculate(self, user):
+        """Start searching the enemy's turn on a thread while the player plays theirs. Called at the start of PLAY.
+
+        The search runs on a copy of the match, in which the player plays by the rollout policy. When the enemy's turn
+        comes, the tree of the speculation is searched on from the actual position, unless the player left the match
+        just as the copy guessed, in which case only the part of the time budget the speculation did not get to is
+        left (see _take_speculation). Nothing is searched ahead while debug events are logged, as the rollouts of
+        the thread would log theirs too.
+        """
+        global _speculator
+        self._drop_speculation()
+        match = user.match
+        if (match is None or match.match_over or user is not match.enemy or match.phase != Phase.PLAY
+                or log.level < WARNING):
+            return
+        replay = match.replay
+        match.replay = None  # The copy is not recorded
+        try:
+            # A copy rather than a snapshot, as a snapshot shares its cards with the match the player is playing in
+            copy = pickle.loads(pickle.dumps(match, pickle.HIGHEST_PROTOCOL))
+        finally:
+            match.replay = replay
+        copy.speculate_enemy = False
+        search = MonteCarloSearch(self.time_budget, self.max_rollouts, self.horizon, self.exploration, workers=0,
+                                  seed=self.rng.getrandbits(64), rollout_policy=self.rollout_policy)
+        if self._next_root is not None:
+            # The speculation grows the tree kept from the last turn, which is handed back by _take_speculation
+            next_match, next_turn, next_tree = self._next_root
+            if next_match() is match and next_turn == match.turn:
+                search._next_root = (weakref.ref(copy), copy.turn, next_tree)
+            self._next_root = None
+        if _speculator is None:
+            _speculator = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speculation')
+        self._speculation = (weakref.ref(match), match.turn, search, _speculator.submit(_speculate_in_copy, copy,
+                                                                                          search))
+
+    def _take_speculation(self, match) -> float:
+        """Stop the speculation and keep its tree for this turn. Return how long this turn still has to be searched.
+
+        That is the whole time budget, unless the speculation searched the turn from the position the match is
+        actually in.
+        """
+        speculation = self._speculation
+        self._speculation = None
+        if speculation is None:
+            return self.time_budget
+        speculated_match, turn, search, future = speculation
+        search.stop()
+        result = future.result()  # Only waits for the rollout it was in the middle of
+        if speculated_match() is not match or turn != match.turn:
+            return self.time_budget
+        self._next_root = (weakref.ref(match), match.turn, search.root)
+        if result is not None:
+            position, elapsed = result
+            if position == _position(match):
+                return max(0.0, self.time_budget - elapsed)
+        return self.time_budget
+
+    def _drop_speculation(self):
+        if self._speculation is not None:
+            self._speculation[2].stop()
+            self._speculation = None
+
+    def stop(self):
+        """Make a search running on another thread return once the rollout it is in the middle of is over."""
+        self._stopped = True
+
+    def close(self):
+        """Drop the trees, once the match they were searched in is over or replaced. See Strategy.release_strategy."""
+        self._drop_speculation()
+        self.root = None
+        self._next_root = None
+        self._node = None
+        self._path = []
+
+    def __getstate__(self):
+        # A weak reference can't be pickled, and a copy of the search is not searching the same match anyway
+        state = self.__dict__.copy()
+        state['_next_root'] = None
+        state['_speculation'] = None
+        return state
@@ -0,0 +1,25 @@
+"""Seeded random number streams.
+
+Every GameManager owns a root seed, and every match and user draws from its own stream derived from it. Derived
+streams are independent of each other and of the order they are created in, so parallel workers never share a
+stream, and a match can be reproduced from the root seed alone.
+"""
+import hashlib
+import random
+
+
+def new_seed():
+    """Return a fresh 64-bit seed from the operating system's entropy."""
+    return random.SystemRandom().getrandbits(64)
+
+
+def spawn_seed(seed, *path):
+    """Return a 64-bit seed derived from the parent seed and a path, such as (match_number, 'enemy')."""
+    key = repr((seed,) + path).encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'little')
+
+
+def spawn_rng(seed, *path):
+    """Return a random.Random for the child stream of the parent seed at the given path."""
+    return random.Random(spawn_seed(seed, *path))
+
@@ -0,0 +1,161 @@
+"""Headless batch simulator for AI-vs-AI matches.
+
+Runs full matches, or whole runs (GameManager.start_match through to game_over), back-to-back across a
+multiprocessing pool with no UI attached, then reports throughput and win rates per tier.
+
+Usage (from the Game directory):
+    python Simulator.py --runs 1000
+    python Simulator.py --matches 100000 --match-number 5 --workers 8
+    python Simulator.py --matches 1000 --match-number 5 --enemy-strategy mcts
+"""
+import argparse
+import time
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+
+from Card import IdAllocator
+from GameManager import GameManager
+from Match import Match
+from Seeding import new_seed, spawn_rng, spawn_seed
+from Strategy import DEFAULT_STRATEGY, release_strategy, strategies
+from User import Enemy, Player
+
+# Matches where neither side can finish the other off (e.g. The Unceasing Void) are called a draw after this many turns
+MAX_TURNS = 100
+
+
+def tier_for_match(match_number: int):
+    """Return the tier GameManager uses for the given match number (the tier goes up every 2 matches)."""
+    return min(5, 1 + match_number // 2)
+
+
+def play_match(match: Match, max_turns: int = MAX_TURNS):
+    """Drive a match from its PLAY phase until it is over, with the player using the same AI as the enemy."""
+    while not match.match_over:
+        if match.turn > max_turns:
+            match.end_match(None)
+            break
+        match.player.play_turn()
+        # PLAY -> ENEMY_PLAY -> EFFECTS -> ATTACKS
+        for i in range(3):
+            match.cycle_phase()
+        if match.match_over:
+            break
+        # ATTACKS -> DRAW, which cycles on to PLAY by itself
+        match.cycle_phase()
+    return match.winner
+
+
+def outcome(match: Match):
+    """Return 'player', 'enemy' or 'draw' for a finished match."""
+    if match.winner is None:
+        return 'draw'
+    elif match.winner is match.player:
+        return 'player'
+    return 'enemy'
+
+
+def simulate_runs(count: int, seed: int, enemy_strategy: str = DEFAULT_STRATEGY):
+    """Play whole runs and return a list of (tier, outcome) for every match played."""
+    results = []
+    for i in range(count):
+        game_manager = GameManager(seed=spawn_seed(seed, i), enemy_strategy=enemy_strategy)
+        while not game_manager.game_over:
+            match = game_manager.current_match
+            play_match(match)
+            results.append((match.tier, outcome(match)))
+            game_manager.check_match()
+    return results
+
+
+def simulate_matches(count: int, match_number: int, seed: int, enemy_strategy: str = DEFAULT_STRATEGY):
+    """Play single matches at the given match number and return a list of (tier, outcome)."""
+    tier = tier_for_match(match_number)
+    deck_size = match_number * 2 + 10
+    results = []
+    for i in range(count):
+        ids = IdAllocator()
+        player = Player(match_number, tier, 'Player', deck_size, rng=spawn_rng(seed, i, 'player'), ids=ids)
+        enemy = Enemy(match_number, tier, deck_size, rng=spawn_rng(seed, i, 'enemy'), ids=ids)
+        enemy.strategy = enemy_strategy
+        match = Match(tier, player, enemy, match_number)
+        match.start()
+        play_match(match)
+        release_strategy(player)
+        release_strategy(enemy)
+        results.append((match.tier, outcome(match)))
+    return results
+
+
+def _run_chunk(job):
+    mode, count, match_number, seed, enemy_strategy = job
+    if mode == 'runs':
+        return simulate_runs(count, seed, enemy_strategy)
+    return simulate_matches(count, match_number, seed, enemy_strategy)
+
+
+def run_batch(mode: str, total: int, match_number: int = 1, workers=None, chunk_size: int = 50, seed=None,
+              enemy_strategy: str = DEFAULT_STRATEGY):
+    """Split the batch into chunks, play them across a process pool and return (results, elapsed seconds)."""
+    if seed is None:
+        seed = new_seed()
+    jobs = []
+    for i, start in enumerate(range(0, total, chunk_size)):
+        # Every chunk gets its own independent stream, so the results do not depend on how chunks land on workers
+        jobs.append((mode, min(chunk_size, total - start), match_number, spawn_seed(seed, i), enemy_strategy))
+
+    results = []
+    start_time = time.perf_counter()
+    with Pool(workers) as pool:
+        for chunk_results in pool.imap_unordered(_run_chunk, jobs):
+            results.extend(chunk_results)
+    return results, time.perf_counter() - start_time
+
+
+def format_report(results, elapsed: float):
+    """Return a string with the throughput and the win rates per tier."""
+    per_tier = defaultdict(Counter)
+    for tier, result in results:
+        per_tier[tier][result] += 1
+
+    lines = [
+        f"Matches: {len(results)}",
+        f"Elapsed: {elapsed:.2f}s",
+        f"Throughput: {len(results) / elapsed if elapsed else 0:.1f} matches/sec",
+        "",
+        f"{'Tier':<6}{'Matches':>10}{'Player':>10}{'Enemy':>10}{'Draw':>10}",
+    ]
+    for tier in sorted(per_tier):
+        counts = per_tier[tier]
+        played = sum(counts.values())
+        lines.append(
+            f"{tier:<6}{played:>10}"
+            f"{counts['player'] / played:>10.1%}{counts['enemy'] / played:>10.1%}{counts['draw'] / played:>10.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AI-vs-AI CardMaster matches headless across all cores.")
+    batch = parser.add_mutually_exclusive_group(required=True)
+    batch.add_argument('--runs', type=int, help="number of whole runs to play (until the player loses)")
+    batch.add_argument('--matches', type=int, help="number of single matches to play")
+    parser.add_argument('--match-number', type=int, default=1, help="match number used by --matches (default: 1)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--chunk-size', type=int, default=50, help="runs or matches handed to a worker at a time")
+    parser.add_argument('--seed', type=int, default=None, help="seed for reproducible batches")
+    parser.add_argument('--enemy-strategy', default=DEFAULT_STRATEGY, choices=sorted(strategies),
+                        help=f"strategy the enemies play with (default: {DEFAULT_STRATEGY})")
+    args = parser.parse_args()
+
+    if args.runs is not None:
+        results, elapsed = run_batch('runs', args.runs, workers=args.workers, chunk_size=args.chunk_size,
+                                     seed=args.seed, enemy_strategy=args.enemy_strategy)
+    else:
+        results, elapsed = run_batch('matches', args.matches, args.match_number, args.workers, args.chunk_size,
+                                     args.seed, args.enemy_strategy)
+    print(format_report(results, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Card selection strategies for User.play_turn.
+
+A strategy is a function strategy(user, mana, hand) that returns the cards to play, in the order they should be
+played. The hand is a copy of the user's hand sorted by tier in descending order. Strategies are registered
+by name so that new ones can be tried out without touching User:
+
+    @register_strategy('cheapest_first')
+    def cheapest_first(user, mana, hand):
+        ...
+
+    enemy.strategy = 'cheapest_first'
+
+A user's strategy can also be set to a strategy function directly, without registering it.
+
+A strategy that takes long enough to be worth starting early can also have a speculate(user) attribute. When the match
+has speculate_enemy set, it is called at the start of the player's turn, so the enemy's turn can be worked out while
+the player plays (see User.speculate_turn and Search.MonteCarloSearch.speculate).
+"""
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+
+DEFAULT_STRATEGY = 'knapsack'
+
+strategies = {}
+
+
+def register_strategy(name: str):
+    """Decorator registering a strategy under the given name."""
+    def decorator(strategy):
+        strategies[name] = strategy
+        return strategy
+    return decorator
+
+
+def get_strategy(name: str):
+    """Return the strategy registered under the given name."""
+    if name not in strategies:
+        raise ValueError(f"Unknown strategy {name!r}. Registered strategies: {', '.join(sorted(strategies))}.")
+    return strategies[name]
+
+
+@lru_cache(maxsize=4096)
+def _copies_per_tier(mana: int, tier_counts: tuple):
+    """Solve the bounded knapsack over a tier multiset.
+
+    tier_counts holds (tier, number of cards) pairs in descending tier order. Returns how many cards of each tier to
+    play so that the most mana is spent, taking as few cards of the higher tiers as possible when several selections
+    spend the same mana. That is the selection the original exhaustive search settled on, as it only kept a card
+    when playing it was strictly better than skipping it.
+    """
+    # best[g][m] is the most mana that can be spent with m mana using the tiers from g onwards
+    best = [[0] * (mana + 1) for i in range(len(tier_counts) + 1)]
+    for g in range(len(tier_counts) - 1, -1, -1):
+        tier, count = tier_counts[g]
+        row, rest = best[g], best[g + 1]
+        for m in range(mana + 1):
+            row[m] = max(j * tier + rest[m - j * tier] for j in range(min(count, m // tier) + 1))
+
+    copies = []
+    for g, (tier, count) in enumerate(tier_counts):
+        rest = best[g + 1]
+        j = 0
+        while j * tier + rest[mana - j * tier] != best[g][mana]:
+            j += 1
+        copies.append(j)
+        mana -= j * tier
+    return tuple(copies)
+
+
+@register_strategy('knapsack')
+def knapsack(user, mana: int, hand: list):
+    """Spend as much mana as possible. Runs in time independent of the hand size for a given mana."""
+    if mana <= 0 or not hand:
+        return []
+    hand = sorted(hand, key=lambda card: card.tier, reverse=True)
+
+    # Split the hand into runs of cards with the same tier
+    groups = []
+    for card in hand:
+        if groups and groups[-1][0].tier == card.tier:
+            groups[-1].append(card)
+        else:
+            groups.append([card])
+
+    copies = _copies_per_tier(mana, tuple((group[0].tier, len(group)) for group in groups))
+    selection = []
+    for group, taken in zip(groups, copies):
+        # Among cards of the same tier, the later ones in the hand are the ones played
+        if taken:
+            selection.extend(group[-taken:])
+    return selection
+
+
+@register_strategy('exhaustive')
+def exhaustive(user, mana: int, hand: list):
+    """The original branch-and-recurse search. Exponential in the hand size, kept as a reference."""
+    if mana == 0 or not hand:
+        return []
+
+    # Consider the most powerful card first (already sorted)
+    current_card = hand[0]
+
+    # If the card's mana cost is exactly the mana, or it fits within the mana, play it
+    if current_card.tier <= mana:
+        # Include this card in the selection and see if more can be played
+        with_card = [current_card] + exhaustive(user, mana - current_card.tier, hand[1:])
+        # Also consider not playing this card and see which option is better
+        without_card = exhaustive(user, mana, hand[1:])
+
+        # Choose the option that uses the most mana efficiently or maximizes the number of cards played
+        if sum(card.tier for card in with_card) > sum(card.tier for card in without_card):
+            return with_card
+        else:
+            return without_card
+    else:
+        # Skip this card as it's too costly to play
+        return exhaustive(user, mana, hand[1:])
+
+
+# The search of every user playing with the 'mcts' strategy, which keeps its tree from one turn to the next
+_searches = WeakKeyDictionary()
+
+
+def _search_of(user):
+    search = _searches.get(user)
+    if search is None:
+        from Search import MonteCarloSearch  # Deferred, as Search imports Match, which imports User, which imports us
+        search = _searches[user] = MonteCarloSearch()
+    return search
+
+
+@register_strategy('mcts')
+def mcts(user, mana: int, hand: list):
+    """Monte-Carlo tree search over the cards to play, see Search.MonteCarloSearch. The hard opponent."""
+    return _search_of(user)(user, mana, hand)
+
+
+def _speculate_mcts(user):
+    _search_of(user).speculate(user)
+
+
+mcts.speculate = _speculate_mcts
+
+
+def release_strategy(user):
+    """Forget what the user's strategy kept between turns, such as the tree of 'mcts', once its match is over."""
+    search = _searches.pop(user, None)
+    if search is not None:
+        search.close()
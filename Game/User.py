@@ -1,48 +1,59 @@
 import copy
-import uuid
+import random
+from typing import Optional
 
-from Card import Deck
+from Card import Board, Deck, IdAllocator, card_ids
+from EventLog import log
+from Strategy import DEFAULT_STRATEGY, get_strategy
 
 
 class User:
-    def __init__(self, name: str, deck_size: int, mode: str):
+    def __init__(self, name: str, deck_size: int, mode: str, rng: Optional[random.Random] = None,
+                 ids: Optional[IdAllocator] = None):
         self.name = name
         self.mode = mode
         self.hp = 10
         self.mana = 0  # Mana = current tier + 2, given by Match
-        self.alive_deck = Deck()
-        self.dead_deck = Deck()
-        self.cards_on_board = Deck()
-        self.hand = Deck()
+        self.rng = rng if rng is not None else random.Random()  # Every random choice for this user's cards uses it
+        self.ids = ids if ids is not None else card_ids  # Allocator for the ids of this user's cards
+        self.alive_deck = Deck(self.rng, self.ids)
+        self.dead_deck = Deck(self.rng, self.ids)
+        self.cards_on_board = Board(self.rng, self.ids)
+        self.hand = Deck(self.rng, self.ids)
+        for deck in (self.alive_deck, self.dead_deck, self.cards_on_board, self.hand):
+            deck.owner = self
+        self.match = None  # Set by the Match this user plays in
         self.hand_size = 5
         self.deck_size = 10
+        self.strategy = DEFAULT_STRATEGY  # Registered strategy name (or a strategy function) play_turn picks cards with
 
         # Status effects for cards to work
         self.shield = False
         self.frozen = False
 
     def kill_card(self, card):
-        self.dead_deck.cards.append(card)
-        self.alive_deck.cards.remove(card)
+        self.dead_deck.add(card)
+        self.alive_deck.remove(card)
 
     def play_card(self, card):
         if self.mana >= card.tier:
             self.mana -= card.tier
-            self.cards_on_board.cards.append(card)
-            self.hand.cards.remove(card)
-            self.print_debug(f"play_card: Playing card {card.name} with tier {card.tier}.")
-            self.print_debug(f"play_card: Hand before playing card with UUID {card.uuid}:")
-            self.print_debug(str(self.hand))
-            self.print_debug(f"play_card: Cards on board before playing card with UUID {card.uuid}:")
-            self.print_debug(str(self.cards_on_board))
-            self.print_debug(f"play_card: Hand after playing card with UUID {card.uuid}:")
-            self.print_debug(str(self.hand))
-            self.print_debug(f"play_card: Cards on board after playing card with UUID {card.uuid}:")
-            self.print_debug(str(self.cards_on_board))
-            self.print_debug(f"play_card: Card {card.name} played. Mana remaining: {self.mana}.")
+            self.cards_on_board.add(card)
+            if self.match is not None and self.match.replay is not None:
+                self.match.replay.record_play(self.match, self, self.hand.index(card))
+            self.hand.remove(card)
+            # Building the deck dumps is expensive, so only do it when someone is listening
+            if self.debug_enabled:
+                self.print_debug(f"play_card: Playing card {card.name} with tier {card.tier}.")
+                self.print_debug(f"play_card: Hand after playing card with id {card.uuid}:")
+                self.print_debug(str(self.hand))
+                self.print_debug(f"play_card: Cards on board after playing card with id {card.uuid}:")
+                self.print_debug(str(self.cards_on_board))
+                self.print_debug(f"play_card: Card {card.name} played. Mana remaining: {self.mana}.")
             return True
         else:
-            print("No mana to play a card.")
+            if log.info_enabled:
+                log.info(f"User {self.name}", "No mana to play a card.")
             return False
 
     # Sacrifice 1 HP to send all cards on the board to the dead deck and redraw as many as they are from the alive deck
@@ -53,24 +64,61 @@ class User:
         for card in self.cards_on_board.cards:
             self.hp -= 1
             self.check_hp()
-            self.dead_deck.cards.append(card)
+            self.dead_deck.add(card)
             self.draw_card()
-        self.cards_on_board.cards.clear()
+        self.cards_on_board.clear()
 
     def draw_card(self):
-        if len(self.alive_deck.cards) > 0:
+        if len(self.alive_deck) > 0:
             card = self.alive_deck.draw()
-            self.hand.cards.append(card)
+            self.hand.add(card)
         else:
-            if len(self.hand.cards) <= 0:
-                for card in self.dead_deck.cards:
+            if len(self.hand) <= 0:
+                # Every other dead card is recycled, which is what this loop did back when removing a card shifted
+                # the rest of the list under it
+                for card in self.dead_deck.cards[::2]:
                     card.hp = card.temp_hp
                     card.attack = card.temp_attack
-                    card.uuid = uuid.uuid4()
-                    self.alive_deck.cards.append(card)
-                    self.dead_deck.cards.remove(card)
+                    self.dead_deck.reassign_id(card, self.ids())
+                    self.alive_deck.add(card)
+                    self.dead_deck.remove(card)
                     self.draw_card()
-            print("No cards left in the deck.")
+            if log.info_enabled:
+                log.info(f"User {self.name}", "No cards left in the deck.")
+
+    def snapshot(self):
+        """Return the user's state, random stream position, next card id, the order of every deck, and the state of
+        every card in them as a compact tuple."""
+        decks = (tuple(self.alive_deck.cards), tuple(self.dead_deck.cards), tuple(self.cards_on_board.cards),
+                 tuple(self.hand.cards))
+        card_states = tuple(card.snapshot() for deck in decks for card in deck)
+        shuffled = (self.alive_deck.shuffled, self.dead_deck.shuffled, self.cards_on_board.shuffled,
+                    self.hand.shuffled)
+        return (self.hp, self.mana, self.shield, self.frozen, self.rng.getstate(), self.ids.next_id, decks, shuffled,
+                card_states, self.cards_on_board.version)
+
+    def restore(self, state: tuple):
+        """Put the user, its decks and its cards back into a state returned by snapshot."""
+        (self.hp, self.mana, self.shield, self.frozen, rng_state, next_id, decks, shuffled, card_states,
+         board_version) = state
+        self.rng.setstate(rng_state)
+        # Summons and recycled cards get the same ids as they did the first time round
+        self.ids.next_id = next_id
+        # Empty the decks before the cards get their old ids back, so the match's registry forgets the current ids
+        own_decks = (self.alive_deck, self.dead_deck, self.cards_on_board, self.hand)
+        for deck in own_decks:
+            deck.clear()
+        i = 0
+        for deck in decks:
+            for card in deck:
+                card.restore(card_states[i])
+                i += 1
+        for own_deck, cards, deck_shuffled in zip(own_decks, decks, shuffled):
+            own_deck.replace(cards)
+            own_deck.shuffled = deck_shuffled
+        # The board holds the same cards in the same order as when the snapshot was taken, so effect plans made for it
+        # then still hold
+        self.cards_on_board.version = board_version
 
     def check_hp(self):
         if self.hp <= 0:
@@ -79,17 +127,48 @@ class User:
 
     def create_new_card(self, lowest_tier: int, highest_tier: int):
         new_card = copy.copy(self.alive_deck.randomiser(lowest_tier, highest_tier))
-        new_card.uuid = uuid.uuid4()
+        new_card.uuid = self.ids()
         return new_card
 
+    def create_new_cards(self, count: int, lowest_tier: int, highest_tier: int):
+        """Return count new cards between the given tiers."""
+        return [self.create_new_card(lowest_tier, highest_tier) for i in range(count)]
+
+    @property
+    def debug_enabled(self):
+        """Whether this user's debug events are kept. Check it before building an expensive message."""
+        return self.mode == "debug" and log.debug_enabled
+
     def print_debug(self, message: str):
-        if self.mode == "debug":
-            print(f"DEBUG User {self.name}: {message}")
-    
+        if self.debug_enabled:
+            log.debug(f"User {self.name}", message)
+
+    def play_turn(self):
+        """Play the cards picked by this user's strategy. Used by the Enemy, and by the simulator to drive the Player."""
+        # Sort the hand by tier in descending order to try playing powerful cards first. The hand itself is left in
+        # its order, so that a replay feeding recorded hand positions back in sees the same hand.
+        played_cards = self.ai(self.mana, sorted(self.hand.cards, key=lambda x: x.tier, reverse=True))
+        for card in played_cards:
+            self.play_card(card)
+
+    def _strategy_function(self):
+        return self.strategy if callable(self.strategy) else get_strategy(self.strategy)
+
+    def speculate_turn(self):
+        """Let the strategy start working this user's turn out while the other side plays, if it can (see Strategy)."""
+        speculate = getattr(self._strategy_function(), 'speculate', None)
+        if speculate is not None:
+            speculate(self)
+
+    def ai(self, totalMana, hand):
+        """Return the cards this user's strategy would play with the given mana and hand."""
+        return self._strategy_function()(self, totalMana, hand)
+
 
 class Player(User):
-    def __init__(self, current_match: int, current_tier: int, name: str, deck_size: int, mode: str = 'player'):
-        super().__init__(name, deck_size, mode)
+    def __init__(self, current_match: int, current_tier: int, name: str, deck_size: int, mode: str = 'player',
+                 rng: Optional[random.Random] = None, ids: Optional[IdAllocator] = None):
+        super().__init__(name, deck_size, mode, rng, ids)
 
         self.alive_deck.owner = self
         self.dead_deck.owner = self
@@ -106,35 +185,33 @@ class Player(User):
 
         tier_score = 2 + current_match * 5
         # The enemy should always have the maximum number of cards possible for the current match, as if they are a player buying every card in the store every round.
-        self.print_debug(f"Generating enemy deck with tier score {tier_score}.")
+        if self.debug_enabled:
+            self.print_debug(f"Generating enemy deck with tier score {tier_score}.")
         current_tier_score = 0
         deck = []
         # The enemy gets 2 cards of the current tier, 2 cards of the previous tier, and then random cards until they reach the deck size indicated by tier_score.
-        for i in range(2):
-            current_card = self.create_new_card(current_tier, current_tier)
-            self.alive_deck.cards.append(current_card)
-            current_tier_score += current_card.tier
-            self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
-            self.print_debug(f"Current tier score: {current_tier_score}.")
-        for i in range(2):
-            current_card = self.create_new_card(current_tier - 1, current_tier - 1)
-            self.alive_deck.cards.append(current_card)
+        for current_card in self.create_new_cards(2, current_tier, current_tier) + \
+                self.create_new_cards(2, current_tier - 1, current_tier - 1):
+            self.alive_deck.add(current_card)
             current_tier_score += current_card.tier
-            self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
-            self.print_debug(f"Current tier score: {current_tier_score}.")
+            if self.debug_enabled:
+                self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
+                self.print_debug(f"Current tier score: {current_tier_score}.")
         while current_tier_score < tier_score:
             current_card = self.create_new_card(1, current_tier)
-            self.alive_deck.cards.append(current_card)
+            self.alive_deck.add(current_card)
             current_tier_score += current_card.tier
-            self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
-            self.print_debug(f"Current tier score: {current_tier_score}.")
-            self.print_debug(f"Enemy deck generated with {len(self.alive_deck.cards)} cards.")
+            if self.debug_enabled:
+                self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
+                self.print_debug(f"Current tier score: {current_tier_score}.")
+                self.print_debug(f"Enemy deck generated with {len(self.alive_deck.cards)} cards.")
 
     
 
 class Enemy(User):
-    def __init__(self, current_match: int, current_tier: int, deck_size: int, name: str = 'Enemy', mode: str = 'enemy'):
-        super().__init__(name, deck_size, mode)
+    def __init__(self, current_match: int, current_tier: int, deck_size: int, name: str = 'Enemy', mode: str = 'enemy',
+                 rng: Optional[random.Random] = None, ids: Optional[IdAllocator] = None):
+        super().__init__(name, deck_size, mode, rng, ids)
 
         self.alive_deck.owner = self
         self.dead_deck.owner = self
@@ -142,56 +219,23 @@ class Enemy(User):
 
         tier_score = 2 + current_match * 5
         # The enemy should always have the maximum number of cards possible for the current match, as if they are a player buying every card in the store every round.
-        self.print_debug(f"Generating enemy deck with tier score {tier_score}.")
+        if self.debug_enabled:
+            self.print_debug(f"Generating enemy deck with tier score {tier_score}.")
         current_tier_score = 0
         deck = []
         # The enemy gets 2 cards of the current tier, 2 cards of the previous tier, and then random cards until they reach the deck size indicated by tier_score.
-        for i in range(2):
-            current_card = self.create_new_card(current_tier, current_tier)
-            self.alive_deck.cards.append(current_card)
-            current_tier_score += current_card.tier
-            self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
-            self.print_debug(f"Current tier score: {current_tier_score}.")
-        for i in range(2):
-            current_card = self.create_new_card(current_tier - 1, current_tier -1)
-            self.alive_deck.cards.append(current_card)
+        for current_card in self.create_new_cards(2, current_tier, current_tier) + \
+                self.create_new_cards(2, current_tier - 1, current_tier - 1):
+            self.alive_deck.add(current_card)
             current_tier_score += current_card.tier
-            self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
-            self.print_debug(f"Current tier score: {current_tier_score}.")
+            if self.debug_enabled:
+                self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
+                self.print_debug(f"Current tier score: {current_tier_score}.")
         while current_tier_score < tier_score:
             current_card = self.create_new_card(1, current_tier)
-            self.alive_deck.cards.append(current_card)
+            self.alive_deck.add(current_card)
             current_tier_score += current_card.tier
-            self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
-            self.print_debug(f"Current tier score: {current_tier_score}.")
-            self.print_debug(f"Enemy deck generated with {len(self.alive_deck.cards)} cards.")
-
-    def play_turn(self):
-        # Sort the hand by tier in descending order to try playing powerful cards first
-        self.hand.cards.sort(key=lambda x: x.tier, reverse=True)
-        played_cards = self.ai(self.mana, self.hand.cards)
-        for card in played_cards:
-            self.play_card(card)
-
-    def ai(self, totalMana, hand):
-        if totalMana == 0 or not hand:
-            return []
-
-        # Consider the most powerful card first (already sorted)
-        current_card = hand[0]
-
-        # If the card's mana cost is exactly the totalMana, or it fits within the mana, play it
-        if current_card.tier <= totalMana:
-            # Include this card in the selection and see if more can be played
-            with_card = [current_card] + self.ai(totalMana - current_card.tier, hand[1:])
-            # Also consider not playing this card and see which option is better
-            without_card = self.ai(totalMana, hand[1:])
-
-            # Choose the option that uses the most mana efficiently or maximizes the number of cards played
-            if sum(card.tier for card in with_card) > sum(card.tier for card in without_card):
-                return with_card
-            else:
-                return without_card
-        else:
-            # Skip this card as it's too costly to play
-            return self.ai(totalMana, hand[1:])
+            if self.debug_enabled:
+                self.print_debug(f"Added card {current_card.name} with tier {current_card.tier}.")
+                self.print_debug(f"Current tier score: {current_tier_score}.")
+                self.print_debug(f"Enemy deck generated with {len(self.alive_deck.cards)} cards.")
@@ -0,0 +1,29 @@
+"""Enemy.ai picking cards out of hands of growing size, and the tree search of the hard opponent."""
+import copy
+import random
+
+import pytest
+
+from Card import cards_list
+from Search import MonteCarloSearch
+from Strategy import _copies_per_tier
+
+MANA = 7  # The most mana a user gets, at tier 5
+HAND_SIZES = [5, 10, 20, 40]
+ROLLOUTS = 50  # Rollouts per search, in place of a time budget so that every round does the same work
+
+
+@pytest.mark.parametrize('hand_size', HAND_SIZES)
+def bench_enemy_ai(benchmark, seed, make_users, hand_size):
+    player, enemy = make_users()
+    hand = sorted((copy.copy(card) for card in random.Random(seed).choices(cards_list, k=hand_size)),
+                  key=lambda card: card.tier, reverse=True)
+    # The knapsack caches its solutions per tier mix, so it is cleared to time a hand the strategy has not seen yet
+    benchmark.pedantic(enemy.ai, args=(MANA, hand), setup=_copies_per_tier.cache_clear, rounds=1000)
+
+
+def bench_mcts_search(benchmark, seed, enemy_turn_match):
+    enemy = enemy_turn_match.enemy
+    hand = sorted(enemy.hand.cards, key=lambda card: card.tier, reverse=True)
+    search = MonteCarloSearch(time_budget=float('inf'), max_rollouts=ROLLOUTS, workers=0, seed=seed)
+    benchmark.pedantic(search.search, args=(enemy, enemy.mana, hand), rounds=20)
@@ -0,0 +1,45 @@
+"""Card generation: loading the catalog, drawing from it and dealing whole decks."""
+import random
+
+import pytest
+
+from Card import CATALOG_PATH, Deck, IdAllocator, compile_catalog, load_catalog
+from User import Enemy, Player
+
+MATCH_NUMBERS = [1, 5, 9]
+
+
+def tier_for_match(match_number: int):
+    return min(5, 1 + match_number // 2)
+
+
+def bench_load_catalog(benchmark):
+    load_catalog()  # Make sure the compiled catalog is cached
+    benchmark(load_catalog)
+
+
+def bench_compile_catalog(benchmark):
+    benchmark(compile_catalog, CATALOG_PATH)
+
+
+def bench_randomiser(benchmark, seed):
+    deck = Deck(random.Random(seed))
+    benchmark(deck.randomiser, 1, 5)
+
+
+def bench_create_new_card(benchmark, make_users):
+    player, enemy = make_users()
+    benchmark(player.create_new_card, 1, 5)
+
+
+@pytest.mark.parametrize('match_number', MATCH_NUMBERS)
+def bench_player_deck(benchmark, seed, match_number):
+    tier = tier_for_match(match_number)
+    benchmark(lambda: Player(match_number, tier, 'Player', match_number * 2 + 10, rng=random.Random(seed),
+                             ids=IdAllocator()))
+
+
+@pytest.mark.parametrize('match_number', MATCH_NUMBERS)
+def bench_enemy_deck(benchmark, seed, match_number):
+    tier = tier_for_match(match_number)
+    benchmark(lambda: Enemy(match_number, tier, match_number * 2 + 10, rng=random.Random(seed), ids=IdAllocator()))
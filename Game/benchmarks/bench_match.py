@@ -0,0 +1,52 @@
+"""Match phases on full boards, and whole runs from the first match to game over."""
+from GameManager import GameManager
+from Match import Phase
+from Simulator import play_match
+
+ROUNDS = 1000
+LARGE_BOARD_ROUNDS = 20
+
+
+def bench_activate_effects(benchmark, full_board_match):
+    match = full_board_match
+    state = match.snapshot()
+    # Effects change the boards, so every round starts over from the same boards
+    benchmark.pedantic(match.activate_effects, setup=lambda: match.restore(state), rounds=ROUNDS)
+
+
+def bench_perform_attacks(benchmark, full_board_match):
+    match = full_board_match
+    match.phase = Phase.ATTACKS
+    state = match.snapshot()
+    benchmark.pedantic(match.perform_attacks, setup=lambda: match.restore(state), rounds=ROUNDS)
+
+
+def bench_activate_effects_large_board(benchmark, large_board_match):
+    match = large_board_match
+    state = match.snapshot()
+    benchmark.pedantic(match.activate_effects, setup=lambda: match.restore(state), rounds=LARGE_BOARD_ROUNDS)
+
+
+def bench_activate_effects_whole_board(benchmark, whole_board_match):
+    match = whole_board_match
+    state = match.snapshot()
+    benchmark.pedantic(match.activate_effects, setup=lambda: match.restore(state), rounds=LARGE_BOARD_ROUNDS)
+
+
+def bench_perform_attacks_large_board(benchmark, large_board_match):
+    match = large_board_match
+    match.activate_effects()  # Attack with the boards as the summons left them
+    match.phase = Phase.ATTACKS
+    state = match.snapshot()
+    benchmark.pedantic(match.perform_attacks, setup=lambda: match.restore(state), rounds=LARGE_BOARD_ROUNDS)
+
+
+def bench_game_manager_run(benchmark, seed):
+    def run():
+        game_manager = GameManager(seed=seed)
+        while not game_manager.game_over:
+            play_match(game_manager.current_match)
+            game_manager.check_match()
+        return game_manager
+
+    benchmark(run)
@@ -0,0 +1,44 @@
+"""GameUI.paintEvent, rendered offscreen."""
+import pytest
+from PySide6.QtWidgets import QApplication
+
+from Assets import assets
+from GameManager import GameManager
+from GameUI import GameUI
+
+# Each round paints the whole window, so a fixed number of rounds keeps the run short
+ROUNDS = 100
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def game_ui(app, seed):
+    """A window in the PLAY phase of its second turn, with cards in both hands and on both boards."""
+    game_ui = GameUI()
+    game_ui.game_manager = GameManager(seed=seed)
+    match = game_ui.game_manager.current_match
+    match.player.play_turn()
+    # PLAY -> ENEMY_PLAY -> EFFECTS -> ATTACKS -> DRAW, which cycles on to PLAY by itself
+    for i in range(4):
+        match.cycle_phase()
+    game_ui.init_animation_states()
+    game_ui.resize(1600, 900)
+    # Paint with every image ready, as the rounds would otherwise time how soon the asset pool finishes
+    assets.wait()
+    game_ui.applyBackground()
+    yield game_ui
+    game_ui.timer.stop()
+    game_ui.deleteLater()
+
+
+def bench_paint(benchmark, game_ui):
+    benchmark.pedantic(game_ui.grab, rounds=ROUNDS, warmup_rounds=5)
+
+
+def bench_paint_cold_cache(benchmark, game_ui):
+    # Every round renders each card face again, as the first frame after a resize or a new match does
+    benchmark.pedantic(game_ui.grab, setup=game_ui.card_faces.clear, rounds=ROUNDS)
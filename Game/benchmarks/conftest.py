@@ -0,0 +1,125 @@
+"""Shared fixtures for the benchmark suite.
+
+Every benchmark uses a fixed seed and a fixed mix of cards, so two runs on the same machine time the same work and
+their results can be compared against each other.
+"""
+import copy
+import glob
+import os
+import random
+import sys
+
+import pytest
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = os.path.dirname(BENCHMARKS_DIR)
+STORAGE_DIR = os.path.join(BENCHMARKS_DIR, '.benchmarks')  # Saved runs, one folder per machine and interpreter
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)  # Card images and the UI background are loaded from paths relative to the Game directory
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from Card import IdAllocator, cards_list
+from Match import Match, Phase
+from User import Enemy, Player
+
+SEED = 2205
+MATCH_NUMBER = 9  # Late enough in a run for tier 5 cards and the biggest decks
+TIER = 5
+
+# One of every effect that looks at or changes its neighbours, so both boards are full of interacting cards
+PLAYER_BOARD = ["Cheerleader", "Bank", "Big Shot", "Royal Summoner", "Boom", "Copycat", "Sender", "Nomnom"]
+ENEMY_BOARD = ["Grag", "Rasmus", "Malik", "Time Lord", "Ice Cube", "Hungry Assassin", "Flea", "Big Gunga"]
+
+# Repeated to fill boards of thousands of units. Every Royal Summoner with a unit to its left summons a copy of it, so
+# the boards keep growing while the effects phase walks them
+LARGE_BOARD = ["Royal Summoner", "Grag", "Royal Summoner", "Pew", "Royal Summoner", "Rasmus", "Malik", "Pew Pew"]
+# Effects that look at or change every unit of one or both boards
+WHOLE_BOARD = ["Big Shot", "Cheerleader", "Copycat", "Boom", "Grag"]
+LARGE_BOARD_SIZES = [1000, 4000]
+
+_prototypes = {card.name: card for card in cards_list}
+
+
+def pytest_configure(config):
+    # Runs before pytest-benchmark sets up its session, so the storage and comparison settings still apply
+    if config.option.benchmark_storage == 'file://./.benchmarks':
+        # pytest-benchmark's default is relative to the working directory, which is the Game directory by now
+        config.option.benchmark_storage = 'file://' + STORAGE_DIR
+    if (config.option.benchmark_compare is True and not config.option.benchmark_disable
+            and not glob.glob(os.path.join(STORAGE_DIR, '*', '*.json'))):
+        # The first run on a machine has nothing to compare with, so it is saved as the baseline instead
+        config.option.benchmark_compare = False
+        config.option.benchmark_compare_fail = None
+        config.option.benchmark_save = 'baseline'
+
+
+def new_card(name: str, ids: IdAllocator):
+    card = copy.copy(_prototypes[name])
+    card.uuid = ids()
+    return card
+
+
+@pytest.fixture
+def seed():
+    return SEED
+
+
+@pytest.fixture
+def make_users():
+    """Factory returning a Player and an Enemy for a match number, dealt from streams fixed by SEED."""
+    def make_users(match_number: int = MATCH_NUMBER, tier: int = TIER):
+        ids = IdAllocator()
+        deck_size = match_number * 2 + 10
+        player = Player(match_number, tier, 'Player', deck_size, rng=random.Random(SEED), ids=ids)
+        enemy = Enemy(match_number, tier, deck_size, rng=random.Random(SEED + 1), ids=ids)
+        return player, enemy
+    return make_users
+
+
+@pytest.fixture
+def make_board_match(make_users):
+    """Factory returning a match in its EFFECTS phase with the given cards on the boards."""
+    def make_board_match(player_board: list, enemy_board: list):
+        player, enemy = make_users()
+        match = Match(TIER, player, enemy, MATCH_NUMBER)
+        for user, names in ((player, player_board), (enemy, enemy_board)):
+            for name in names:
+                user.cards_on_board.add(new_card(name, user.ids))
+        match.phase = Phase.EFFECTS
+        return match
+    return make_board_match
+
+
+@pytest.fixture
+def full_board_match(make_board_match):
+    """A match in its EFFECTS phase with PLAYER_BOARD and ENEMY_BOARD on the boards."""
+    return make_board_match(PLAYER_BOARD, ENEMY_BOARD)
+
+
+@pytest.fixture
+def enemy_turn_match(make_users):
+    """A match dealt from SEED, at its first ENEMY_PLAY phase before the enemy has played."""
+    player, enemy = make_users()
+    match = Match(TIER, player, enemy, MATCH_NUMBER)
+    match.start()
+    player.play_turn()
+    match.next_phase()
+    return match
+
+
+def repeat(names: list, size: int):
+    """Return a board of size units repeating names, and the same board shifted along for the other side."""
+    board = [names[i % len(names)] for i in range(size)]
+    return board, board[3:] + board[:3]
+
+
+@pytest.fixture(params=LARGE_BOARD_SIZES)
+def large_board_match(request, make_board_match):
+    """A match in its EFFECTS phase with boards of LARGE_BOARD_SIZES units, repeating LARGE_BOARD."""
+    return make_board_match(*repeat(LARGE_BOARD, request.param))
+
+
+@pytest.fixture(params=LARGE_BOARD_SIZES)
+def whole_board_match(request, make_board_match):
+    """A match in its EFFECTS phase with boards of LARGE_BOARD_SIZES units, repeating WHOLE_BOARD."""
+    return make_board_match(*repeat(WHOLE_BOARD, request.param))
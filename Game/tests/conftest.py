@@ -0,0 +1,17 @@
+"""Shared fixtures for the tests. Run from this directory with: python -m pytest"""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)  # Card images and the UI background are loaded from paths relative to the Game directory
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def app():
+    from PySide6.QtWidgets import QApplication  # Deferred, so only the tests that need a window start Qt
+    return QApplication.instance() or QApplication([])
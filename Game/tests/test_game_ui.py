@@ -0,0 +1,25 @@
+"""GameUI, painted offscreen."""
+from GameManager import GameManager
+from GameUI import GameUI
+
+
+def test_lost_match_ends_the_game_once(app):
+    game_ui = GameUI()
+    game_ui.game_manager = GameManager(seed=11)
+    game_ui.init_animation_states()
+    game_ui.resize(800, 450)
+    game_ui.show()
+    match = game_ui.game_manager.current_match
+    match.player.hp = 0
+    match.check_win_conditions()
+
+    # Every paint, and every repaint one of them asks for, sees the match that is over
+    for i in range(5):
+        game_ui.grab()
+        app.processEvents()
+
+    assert game_ui.game_over
+    assert game_ui.game_manager.player_losses == 1
+    assert not game_ui.timer.isActive()
+    game_ui.close()
+    game_ui.deleteLater()